@@ -3,55 +3,144 @@ GovData-AI FastAPI Backend
 Serves Denver crime + infrastructure analysis via REST API
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, Response
 from pathlib import Path
+from contextlib import asynccontextmanager
 import json
+import orjson
+import threading
 from datetime import datetime
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple
 import os
 
+# Data files served from memory, loaded at startup so the first request
+# to each endpoint doesn't pay for the read
+PRELOAD_FILES = ("analysis_results.json", "summary.json")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the data file cache before serving requests"""
+    for filename in PRELOAD_FILES:
+        if (DATA_DIR / filename).exists():
+            try:
+                load_json_bytes(filename)
+            except HTTPException as e:
+                print(f"Warning: could not preload {filename}: {e.detail}")
+    yield
+
 app = FastAPI(
     title="GovData-AI API",
     description="AI-powered civic data analysis for Denver",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration (allow frontend to call API)
+# Extra production origins can be added as a comma-separated CORS_ORIGINS
+ALLOWED_ORIGINS = [
+    "http://localhost:3000",
+    "http://localhost:5173",
+] + [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:5173",
-        "https://*.vercel.app",
-        "*"  # In production, replace with specific domain
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
+    allow_origins=ALLOWED_ORIGINS,
+    allow_origin_regex=r"https://.*\.vercel\.app",  # Vercel production + preview deployments
+    allow_credentials=False,  # The API is public and read-only; no cookies or auth
+    allow_methods=["GET"],
     allow_headers=["*"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
+# Compress larger dynamic responses; pre-compressed files pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Data directory
 DATA_DIR = Path(__file__).parent / "data"
 
-def load_json_file(filename: str) -> Dict[str, Any]:
-    """Load a JSON file from the data directory"""
+# Parsed data files keyed by filename: (mtime, parsed data, serialized body).
+# The files only change when the pipeline re-runs, so entries are refreshed
+# when the file's mtime moves rather than on every request. The body is
+# serialized on first use by a full-file endpoint.
+_CACHE: Dict[str, Tuple[float, Dict[str, Any], Optional[bytes]]] = {}
+_CACHE_LOCK = threading.Lock()
+
+def _load_cached(filename: str) -> Tuple[float, Dict[str, Any], Optional[bytes]]:
+    """Return the cache entry for a data file, re-reading it only when it changes"""
     file_path = DATA_DIR / filename
-    if not file_path.exists():
+    try:
+        mtime = file_path.stat().st_mtime
+    except FileNotFoundError:
         raise HTTPException(
             status_code=404,
             detail=f"Data file '{filename}' not found. Run the data processing pipeline first."
         )
 
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error reading data file: {e}"
-        )
+    cached = _CACHE.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached
+
+    with _CACHE_LOCK:
+        # Another worker thread may have refreshed the entry while we waited
+        cached = _CACHE.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached
+
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        try:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Files written by older pipeline runs may contain bare NaN,
+            # which orjson rejects but the stdlib parser accepts
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error reading data file: {e}"
+                )
+
+        entry = (mtime, data, None)
+        _CACHE[filename] = entry
+        return entry
+
+def load_json_file(filename: str) -> Dict[str, Any]:
+    """Load a JSON file from the data directory"""
+    return _load_cached(filename)[1]
+
+def load_json_bytes(filename: str) -> bytes:
+    """Load a JSON file from the data directory as a serialized response body"""
+    mtime, data, body = _load_cached(filename)
+    if body is None:
+        # Serialize once per file version rather than once per request
+        body = orjson.dumps(data)
+        with _CACHE_LOCK:
+            if _CACHE.get(filename, (None,))[0] == mtime:
+                _CACHE[filename] = (mtime, data, body)
+    return body
+
+# Serialized payloads built from part of a data file, keyed by
+# (filename, payload name): (mtime of the source file, body)
+_DERIVED_CACHE: Dict[Tuple[str, str], Tuple[float, bytes]] = {}
+
+def derived_json_bytes(filename: str, name: str, build: Callable[[Dict[str, Any]], Any]) -> bytes:
+    """Build and serialize a payload from a data file, once per file version"""
+    mtime, data, _ = _load_cached(filename)
+    cached = _DERIVED_CACHE.get((filename, name))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    body = orjson.dumps(build(data))
+    _DERIVED_CACHE[(filename, name)] = (mtime, body)
+    return body
+
+def data_file_response(filename: str) -> FileResponse:
+    """Serve a pre-serialized data file written by the pipeline straight from disk"""
+    return FileResponse(DATA_DIR / filename, media_type="application/json")
 
 @app.get("/")
 async def root():
@@ -93,56 +182,109 @@ async def health():
 @app.get("/api/summary")
 async def get_summary():
     """Get quick summary of analysis"""
-    data = load_json_file("summary.json")
-    return JSONResponse(content=data)
+    return Response(content=load_json_bytes("summary.json"), media_type="application/json")
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows a gzip-encoded response
+
+    Each coding may carry a q-value; q=0 refuses it. An explicit gzip (or
+    x-gzip) entry wins over the "*" wildcard.
+    """
+    qualities: Dict[str, float] = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in entry.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
 
 @app.get("/api/analysis")
-async def get_analysis():
+async def get_analysis(request: Request):
     """Get full analysis results"""
-    data = load_json_file("analysis_results.json")
-    return JSONResponse(content=data)
+    gzip_file = DATA_DIR / "analysis_results.json.gz"
+    if accepts_gzip(request.headers.get("accept-encoding", "")) and gzip_file.exists():
+        return FileResponse(
+            gzip_file,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+
+    return Response(content=load_json_bytes("analysis_results.json"), media_type="application/json")
 
 @app.get("/api/neighborhoods")
 async def get_neighborhoods():
     """Get neighborhood-level data"""
-    data = load_json_file("analysis_results.json")
+    if (DATA_DIR / "neighborhoods.json").exists():
+        return data_file_response("neighborhoods.json")
+
+    # Older pipeline runs only wrote the combined analysis file
+    body = derived_json_bytes("analysis_results.json", "neighborhoods", _neighborhoods_payload)
+    return Response(content=body, media_type="application/json")
 
+def _neighborhoods_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Neighborhood data plus metadata from the combined analysis"""
     if "neighborhoods" not in data:
         raise HTTPException(
             status_code=404,
             detail="Neighborhood data not found in analysis results"
         )
 
-    return JSONResponse(content={
+    return {
         "neighborhoods": data["neighborhoods"],
         "metadata": data.get("metadata", {})
-    })
+    }
 
 @app.get("/api/stats")
 async def get_statistics():
     """Get statistical analysis"""
-    data = load_json_file("analysis_results.json")
+    if (DATA_DIR / "statistics.json").exists():
+        return data_file_response("statistics.json")
 
+    # Older pipeline runs only wrote the combined analysis file
+    body = derived_json_bytes("analysis_results.json", "statistics", _statistics_payload)
+    return Response(content=body, media_type="application/json")
+
+def _statistics_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Statistics section of the combined analysis"""
     if "statistics" not in data:
         raise HTTPException(
             status_code=404,
             detail="Statistics not found in analysis results"
         )
 
-    return JSONResponse(content=data["statistics"])
+    return data["statistics"]
 
 @app.get("/api/insights")
 async def get_ai_insights():
     """Get AI-generated insights"""
-    data = load_json_file("analysis_results.json")
+    if (DATA_DIR / "insights.json").exists():
+        return data_file_response("insights.json")
+
+    # Older pipeline runs only wrote the combined analysis file
+    body = derived_json_bytes("analysis_results.json", "ai_insights", _insights_payload)
+    return Response(content=body, media_type="application/json")
 
+def _insights_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """AI insights section of the combined analysis"""
     if "ai_insights" not in data:
         raise HTTPException(
             status_code=404,
             detail="AI insights not found in analysis results"
         )
 
-    return JSONResponse(content=data["ai_insights"])
+    return data["ai_insights"]
 
 # For local development
 if __name__ == "__main__":
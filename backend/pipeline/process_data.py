@@ -5,9 +5,16 @@ Processes crime and 311 data to find correlations and generate AI insights
 """
 
 import os
-import json
+import re
+import gzip
+import argparse
+import hashlib
+import orjson
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from datetime import datetime
 from pathlib import Path
 from anthropic import Anthropic
@@ -17,25 +24,103 @@ BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 OUTPUT_DIR = BASE_DIR / "backend" / "api" / "data"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+INSIGHTS_CACHE_DIR = OUTPUT_DIR / "insights_cache"
+
+# Model used for AI insights (part of the insights cache key)
+INSIGHTS_MODEL = "claude-3-opus-20240229"
+
+# orjson options for output files: numpy scalars and non-string index keys
+# are serialized natively instead of falling through to str()
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+# Endpoint payloads are served as-is, so they skip the indentation
+ENDPOINT_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Crime columns used by the analysis
+CRIME_COLUMNS = [
+    'FIRST_OCCURRENCE_DATE',
+    'NEIGHBORHOOD_ID',
+    'INCIDENT_ID',
+    'IS_CRIME',
+    'IS_TRAFFIC',
+    'OFFENSE_CATEGORY_ID'
+]
+CRIME_DTYPES = {
+    'NEIGHBORHOOD_ID': 'category',
+    'OFFENSE_CATEGORY_ID': 'category',
+    'IS_CRIME': 'int8',
+    'IS_TRAFFIC': 'int8'
+}
+
+# 311 columns used by the analysis
+REQUEST_COLUMNS = [
+    'OBJECTID',
+    'Topic',
+    'Case Summary',
+    'Case Created Date',
+    'Case Closed Date',
+    'Case Status',
+    'Neighborhood'
+]
+
+# Keywords identifying streetlight-related 311 requests
+STREETLIGHT_PATTERN = r'street ?light|light out|lamp out|lighting'
+
+# Offense categories counted as property crime
+PROPERTY_CRIME_PATTERN = re.compile(r'larceny|theft|burglary|auto-theft', re.IGNORECASE)
+
+# Only crimes on or after this date are analyzed
+RECENT_CUTOFF = pd.Timestamp('2022-01-01')
+
+def recent_crime_filter(crime_file):
+    """Parquet filter for recent crimes, so older row groups are skipped on read
+
+    Pushdown only applies when the date column is stored as a date/timestamp;
+    string dates are filtered after loading instead.
+    """
+    date_type = pq.read_schema(crime_file).field('FIRST_OCCURRENCE_DATE').type
+    if pa.types.is_timestamp(date_type):
+        return [('FIRST_OCCURRENCE_DATE', '>=', RECENT_CUTOFF)]
+    if pa.types.is_date(date_type):
+        return [('FIRST_OCCURRENCE_DATE', '>=', RECENT_CUTOFF.date())]
+    return None
 
 def load_and_sample_crime_data():
     """Load crime data and create a manageable sample for analysis"""
     print("📊 Loading crime data...")
-    crime_file = DATA_DIR / "crime.csv"
-
-    # Load the data
-    df = pd.read_csv(crime_file)
+    crime_file = DATA_DIR / "raw" / "crime_raw.parquet"
+    csv_file = DATA_DIR / "crime.csv"
+
+    # Load the data, only the columns we analyze: the Parquet written by
+    # 01_download_data_FIXED.py (uppercase, typed columns) unless the CSV is
+    # newer. Both paths read through Arrow's multi-threaded readers.
+    if crime_file.exists() and (not csv_file.exists() or crime_file.stat().st_mtime >= csv_file.stat().st_mtime):
+        df = pd.read_parquet(crime_file, columns=CRIME_COLUMNS, filters=recent_crime_filter(crime_file))
+        df['FIRST_OCCURRENCE_DATE'] = pd.to_datetime(df['FIRST_OCCURRENCE_DATE'])
+    else:
+        df = pd.read_csv(
+            csv_file,
+            usecols=CRIME_COLUMNS,
+            dtype=CRIME_DTYPES,
+            parse_dates=['FIRST_OCCURRENCE_DATE'],
+            engine='pyarrow'
+        )
     print(f"   Loaded {len(df):,} crime records")
 
-    # Parse dates
-    df['FIRST_OCCURRENCE_DATE'] = pd.to_datetime(df['FIRST_OCCURRENCE_DATE'])
-    df['year'] = df['FIRST_OCCURRENCE_DATE'].dt.year
-    df['month'] = df['FIRST_OCCURRENCE_DATE'].dt.month
-
     # Filter to recent data (last 3 years for faster processing)
-    recent_data = df[df['year'] >= 2022].copy()
+    recent_data = df[df['FIRST_OCCURRENCE_DATE'] >= RECENT_CUTOFF].copy()
     print(f"   Filtered to {len(recent_data):,} records (2022+)")
 
+    # Compact dtypes before grouping: categorical keys hash as integer codes,
+    # and the 0/1 flags fit in the smallest integer type
+    for col in ['NEIGHBORHOOD_ID', 'OFFENSE_CATEGORY_ID']:
+        recent_data[col] = recent_data[col].astype('category').cat.remove_unused_categories()
+    flag_cols = ['IS_CRIME', 'IS_TRAFFIC']
+    recent_data[flag_cols] = recent_data[flag_cols].apply(pd.to_numeric, downcast='integer')
+
+    # Time components are only needed for the rows we keep
+    recent_data['year'] = recent_data['FIRST_OCCURRENCE_DATE'].dt.year
+    recent_data['month'] = recent_data['FIRST_OCCURRENCE_DATE'].dt.month
+
     return recent_data
 
 def load_and_filter_311_data():
@@ -43,18 +128,24 @@ def load_and_filter_311_data():
     print("💡 Loading 311 service requests...")
     requests_file = DATA_DIR / "raw" / "311_requests_raw.csv"
 
-    # Load data
-    df = pd.read_csv(requests_file, low_memory=False)
+    # Load data with the multi-threaded Arrow CSV reader, only the columns we use.
+    # Columns stay NumPy-backed so the aggregations keep their usual dtypes.
+    df = pd.read_csv(requests_file, usecols=REQUEST_COLUMNS, engine='pyarrow')
     print(f"   Loaded {len(df):,} 311 requests")
 
-    # Convert to string type and handle NaN values
-    df['Topic'] = df['Topic'].astype(str).fillna('')
-    df['Case Summary'] = df['Case Summary'].astype(str).fillna('')
-
-    # Filter for streetlight-related requests
-    streetlight_keywords = ['street light', 'streetlight', 'light out', 'lamp out', 'lighting']
-    mask = df['Topic'].str.lower().str.contains('|'.join(streetlight_keywords), na=False) | \
-           df['Case Summary'].str.lower().str.contains('|'.join(streetlight_keywords), na=False)
+    # Filter for streetlight-related requests, matching case-insensitively in
+    # Arrow directly on the string buffers (no lowercased copies)
+    mask = pc.or_kleene(
+        pc.match_substring_regex(
+            pa.array(df['Topic'], type=pa.string(), from_pandas=True),
+            STREETLIGHT_PATTERN, ignore_case=True
+        ),
+        pc.match_substring_regex(
+            pa.array(df['Case Summary'], type=pa.string(), from_pandas=True),
+            STREETLIGHT_PATTERN, ignore_case=True
+        )
+    )
+    mask = pc.fill_null(mask, False).to_numpy(zero_copy_only=False)
 
     streetlights = df[mask].copy()
     print(f"   Found {len(streetlights):,} streetlight-related requests")
@@ -68,58 +159,71 @@ def load_and_filter_311_data():
         streetlights['Case Closed Date'] - streetlights['Case Created Date']
     ).dt.days
 
+    # Low-cardinality string columns become categoricals for the groupby
+    streetlights['Neighborhood'] = streetlights['Neighborhood'].astype('category')
+    streetlights['Case Status'] = streetlights['Case Status'].astype('category')
+
+    # Flag open cases once so the neighborhood aggregation is a plain sum
+    streetlights['is_open'] = streetlights['Case Status'] == 'Open'
+
     return streetlights
 
+def matching_categories(series, pattern):
+    """Return the distinct values of a low-cardinality column that match a regex"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.cat.categories
+    else:
+        values = series.dropna().unique()
+    return [value for value in values if pattern.search(str(value))]
+
+def min_max_normalize(values):
+    """Scale a float array to 0-1 in place; a zero range maps to 0 instead of NaN"""
+    values -= values.min()
+    values /= values.max() or 1.0
+    return values
+
 def analyze_by_neighborhood(crime_df, streetlight_df):
     """Analyze crime and infrastructure by neighborhood"""
     print("🏘️  Analyzing by neighborhood...")
 
-    # Crime counts by neighborhood
-    crime_by_hood = crime_df.groupby('NEIGHBORHOOD_ID').agg({
-        'INCIDENT_ID': 'count',
-        'IS_CRIME': 'sum',
-        'IS_TRAFFIC': 'sum'
-    }).rename(columns={
-        'INCIDENT_ID': 'total_incidents',
-        'IS_CRIME': 'crime_count',
-        'IS_TRAFFIC': 'traffic_count'
-    })
-
-    # Property crimes (burglary, theft, etc.)
-    property_crimes = crime_df[crime_df['OFFENSE_CATEGORY_ID'].str.contains(
-        'larceny|theft|burglary|auto-theft', case=False, na=False
-    )]
-    property_by_hood = property_crimes.groupby('NEIGHBORHOOD_ID').size().to_frame('property_crime_count')
+    # Property crimes (burglary, theft, etc.): match the pattern against the
+    # handful of distinct categories, then flag rows by membership
+    property_categories = matching_categories(crime_df['OFFENSE_CATEGORY_ID'], PROPERTY_CRIME_PATTERN)
+    crime_df['is_property'] = crime_df['OFFENSE_CATEGORY_ID'].isin(property_categories)
+
+    # Crime counts by neighborhood, all in a single grouped pass
+    crime_by_hood = crime_df.groupby('NEIGHBORHOOD_ID', observed=True).agg(
+        total_incidents=('INCIDENT_ID', 'count'),
+        crime_count=('IS_CRIME', 'sum'),
+        traffic_count=('IS_TRAFFIC', 'sum'),
+        property_crime_count=('is_property', 'sum')
+    )
 
     # Streetlight requests by neighborhood
-    streetlight_by_hood = streetlight_df.groupby('Neighborhood').agg({
-        'OBJECTID': 'count',
-        'response_days': 'mean',
-        'Case Status': lambda x: (x == 'Open').sum()
-    }).rename(columns={
-        'OBJECTID': 'streetlight_requests',
-        'response_days': 'avg_response_days',
-        'Case Status': 'open_requests'
-    })
+    streetlight_by_hood = streetlight_df.groupby('Neighborhood', observed=True).agg(
+        streetlight_requests=('OBJECTID', 'count'),
+        avg_response_days=('response_days', 'mean'),
+        open_requests=('is_open', 'sum')
+    )
 
     # Merge the data
-    analysis = crime_by_hood.join(property_by_hood, how='left')
-    analysis = analysis.join(streetlight_by_hood, how='left')
+    analysis = crime_by_hood.join(streetlight_by_hood, how='left')
     analysis = analysis.fillna(0)
 
     # Calculate correlation score (0-100)
     if len(analysis) > 0:
-        # Normalize metrics
-        analysis['crime_norm'] = (analysis['crime_count'] - analysis['crime_count'].min()) / \
-                                 (analysis['crime_count'].max() - analysis['crime_count'].min())
-        analysis['streetlight_norm'] = (analysis['streetlight_requests'] - analysis['streetlight_requests'].min()) / \
-                                       (analysis['streetlight_requests'].max() - analysis['streetlight_requests'].min())
+        # Normalize each metric on its own float array
+        crime_norm = min_max_normalize(analysis['crime_count'].to_numpy(dtype=np.float64, copy=True))
+        streetlight_norm = min_max_normalize(analysis['streetlight_requests'].to_numpy(dtype=np.float64, copy=True))
 
         # Crime-infrastructure index (higher = worse)
-        analysis['crime_infrastructure_index'] = (
-            (analysis['crime_norm'] * 0.6) +
-            (analysis['streetlight_norm'] * 0.4)
-        ) * 100
+        index = crime_norm * 0.6
+        index += streetlight_norm * 0.4
+        index *= 100
+
+        analysis['crime_norm'] = crime_norm
+        analysis['streetlight_norm'] = streetlight_norm
+        analysis['crime_infrastructure_index'] = index
 
     print(f"   Analyzed {len(analysis)} neighborhoods")
     return analysis
@@ -169,10 +273,20 @@ def calculate_statistics(crime_df, streetlight_df, neighborhood_analysis):
 
     return stats
 
-def generate_ai_insights(stats, neighborhood_analysis):
+def generate_ai_insights(stats, neighborhood_analysis, force=False):
     """Use Claude to generate natural language insights"""
     print("🤖 Generating AI insights with Claude...")
 
+    # Insights only depend on the statistics, so reuse a previous response
+    # when they haven't changed
+    cache_key = hashlib.sha256(
+        INSIGHTS_MODEL.encode() + orjson.dumps(stats, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    ).hexdigest()
+    cache_file = INSIGHTS_CACHE_DIR / f"{cache_key}.json"
+    if not force and cache_file.exists():
+        print(f"   ✓ Using cached AI insights ({cache_key[:12]})")
+        return orjson.loads(cache_file.read_bytes())
+
     api_key = os.getenv('ANTHROPIC_API_KEY')
     if not api_key:
         print("   ⚠️  Warning: No ANTHROPIC_API_KEY found. Skipping AI insights.")
@@ -212,7 +326,7 @@ Be specific, data-driven, and focus on civic impact.
 
     try:
         message = client.messages.create(
-            model="claude-3-opus-20240229",
+            model=INSIGHTS_MODEL,
             max_tokens=1500,
             messages=[{
                 "role": "user",
@@ -229,6 +343,9 @@ Be specific, data-driven, and focus on civic impact.
             'generated_at': datetime.now().isoformat()
         }
 
+        INSIGHTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_bytes(orjson.dumps(insights, option=JSON_OPTIONS))
+
         print("   ✓ AI insights generated successfully")
         return insights
 
@@ -259,11 +376,31 @@ def save_results(stats, insights, neighborhood_analysis):
     }
 
     output_file = OUTPUT_DIR / 'analysis_results.json'
-    with open(output_file, 'w') as f:
-        json.dump(output, f, indent=2, default=str)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(output, default=str, option=JSON_OPTIONS))
 
     print(f"   ✓ Saved to {output_file}")
 
+    # Compact, gzip-compressed copy the API can send as-is to clients that accept gzip
+    with gzip.open(OUTPUT_DIR / 'analysis_results.json.gz', 'wb', compresslevel=6) as f:
+        f.write(orjson.dumps(output, default=str, option=ENDPOINT_JSON_OPTIONS))
+
+    # Pre-serialized bodies for the API sub-endpoints, so they can be served
+    # straight from disk instead of slicing the full analysis per request
+    endpoint_payloads = {
+        'neighborhoods.json': {
+            'neighborhoods': output['neighborhoods'],
+            'metadata': output['metadata']
+        },
+        'statistics.json': output['statistics'],
+        'insights.json': output['ai_insights']
+    }
+    for filename, payload in endpoint_payloads.items():
+        with open(OUTPUT_DIR / filename, 'wb') as f:
+            f.write(orjson.dumps(payload, default=str, option=ENDPOINT_JSON_OPTIONS))
+
+    print(f"   ✓ Saved endpoint payloads: {', '.join(endpoint_payloads)}")
+
     # Also save a lightweight summary for quick API responses
     summary = {
         'last_updated': datetime.now().isoformat(),
@@ -274,13 +411,21 @@ def save_results(stats, insights, neighborhood_analysis):
     }
 
     summary_file = OUTPUT_DIR / 'summary.json'
-    with open(summary_file, 'w') as f:
-        json.dump(summary, f, indent=2)
+    with open(summary_file, 'wb') as f:
+        f.write(orjson.dumps(summary, option=JSON_OPTIONS))
 
     print(f"   ✓ Saved summary to {summary_file}")
 
 def main():
     """Main pipeline execution"""
+    parser = argparse.ArgumentParser(description="Denver crime + infrastructure analysis pipeline")
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="Regenerate AI insights even when cached insights match the current statistics"
+    )
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("🏙️  DENVER CRIME + INFRASTRUCTURE ANALYSIS PIPELINE")
     print("="*60 + "\n")
@@ -299,7 +444,7 @@ def main():
         stats = calculate_statistics(crime_df, streetlight_df, neighborhood_analysis)
 
         # Step 4: Generate AI insights
-        insights = generate_ai_insights(stats, neighborhood_analysis)
+        insights = generate_ai_insights(stats, neighborhood_analysis, force=args.force)
 
         # Step 5: Save results
         save_results(stats, insights, neighborhood_analysis)
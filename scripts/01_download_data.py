@@ -8,7 +8,9 @@ Downloads and performs initial cleaning of Denver open data for MVP analysis.
 
 import pandas as pd
 import requests
+import ijson
 import json
+import shutil
 from datetime import datetime
 import os
 
@@ -128,37 +130,67 @@ print("-" * 80)
 
 neighborhoods_url = "https://www.denvergov.org/media/gis/DataCatalog/statistical_neighborhoods/geojson/statistical_neighborhoods.geojson"
 
+raw_neighborhoods_path = f"{RAW_DIR}/neighborhoods_raw.geojson"
+neighborhoods_csv_path = f"{RAW_DIR}/neighborhoods_list.csv"
+# ETag/Last-Modified of the saved GeoJSON, so re-runs can skip an unchanged file
+neighborhoods_meta_path = f"{RAW_DIR}/neighborhoods_raw.meta.json"
+
 try:
     print(f"Fetching from: {neighborhoods_url}")
     
-    response = requests.get(neighborhoods_url)
-    neighborhoods_data = response.json()
-    
-    # Save raw GeoJSON
-    raw_neighborhoods_path = f"{RAW_DIR}/neighborhoods_raw.geojson"
-    with open(raw_neighborhoods_path, 'w') as f:
-        json.dump(neighborhoods_data, f)
+    headers = {}
+    if os.path.exists(neighborhoods_meta_path) and os.path.exists(neighborhoods_csv_path):
+        with open(neighborhoods_meta_path) as f:
+            cached_meta = json.load(f)
+        if cached_meta.get('etag'):
+            headers['If-None-Match'] = cached_meta['etag']
+        if cached_meta.get('last_modified'):
+            headers['If-Modified-Since'] = cached_meta['last_modified']
     
-    # Also create a simple CSV with neighborhood names for reference
-    if 'features' in neighborhoods_data:
-        neighborhoods_list = []
-        for feature in neighborhoods_data['features']:
-            props = feature['properties']
-            neighborhoods_list.append({
-                'NBHD_ID': props.get('NBHD_ID'),
-                'NBHD_NAME': props.get('NBHD_NAME'),
-                'SUM_AREA': props.get('SUM_AREA')
-            })
-        
-        neighborhoods_df = pd.DataFrame(neighborhoods_list)
-        neighborhoods_csv_path = f"{RAW_DIR}/neighborhoods_list.csv"
-        neighborhoods_df.to_csv(neighborhoods_csv_path, index=False)
-        
-        print(f"✅ Downloaded {len(neighborhoods_data['features'])} neighborhoods")
-        print(f"   Saved GeoJSON to: {raw_neighborhoods_path}")
-        print(f"   Saved CSV list to: {neighborhoods_csv_path}")
-        print(f"   Sample neighborhoods: {', '.join(neighborhoods_df['NBHD_NAME'].head(5).tolist())}...")
-        print()
+    with requests.get(neighborhoods_url, headers=headers, stream=True, timeout=30) as response:
+        if response.status_code == 304:
+            print(f"✅ Neighborhood boundaries unchanged since last download")
+            print(f"   Keeping: {raw_neighborhoods_path}")
+            print()
+        else:
+            response.raise_for_status()
+            
+            # Stream the body straight to disk; a partial download never
+            # replaces the previous file
+            partial_path = f"{raw_neighborhoods_path}.part"
+            response.raw.decode_content = True
+            with open(partial_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f)
+            os.replace(partial_path, raw_neighborhoods_path)
+            
+            # Also create a simple CSV with neighborhood names for reference,
+            # reading one feature's properties at a time rather than the whole file
+            with open(raw_neighborhoods_path, 'rb') as f:
+                neighborhoods_list = [
+                    {
+                        'NBHD_ID': props.get('NBHD_ID'),
+                        'NBHD_NAME': props.get('NBHD_NAME'),
+                        'SUM_AREA': props.get('SUM_AREA')
+                    }
+                    for props in ijson.items(f, 'features.item.properties', use_float=True)
+                ]
+            
+            if neighborhoods_list:
+                neighborhoods_df = pd.DataFrame(neighborhoods_list)
+                neighborhoods_df.to_csv(neighborhoods_csv_path, index=False)
+                
+                # Only remember the validators once both files are written
+                with open(neighborhoods_meta_path, 'w') as f:
+                    json.dump({
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                    }, f)
+                
+                print(f"✅ Downloaded {len(neighborhoods_list)} neighborhoods")
+                print(f"   Saved GeoJSON to: {raw_neighborhoods_path}")
+                print(f"   Saved CSV list to: {neighborhoods_csv_path}")
+                print(f"   Sample neighborhoods: {', '.join(neighborhoods_df['NBHD_NAME'].head(5).tolist())}...")
+                print()
     
 except Exception as e:
     print(f"❌ Error downloading neighborhood data: {e}")
@@ -179,10 +211,10 @@ print("1. Run: python scripts/02_clean_data.py")
 print("2. Run: python scripts/03_analyze_correlations.py")
 print()
 print("Files created:")
-for root, dirs, files in os.walk(RAW_DIR):
-    for file in files:
-        filepath = os.path.join(root, file)
-        size = os.path.getsize(filepath) / (1024 * 1024)  # MB
-        print(f"  - {filepath} ({size:.2f} MB)")
+with os.scandir(RAW_DIR) as entries:
+    for entry in entries:
+        if entry.is_file():
+            size = entry.stat().st_size / (1024 * 1024)  # MB
+            print(f"  - {entry.path} ({size:.2f} MB)")
 print()
 print("=" * 80)
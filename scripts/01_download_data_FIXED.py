@@ -4,12 +4,18 @@ UPDATED: Download script for Denver's current open data portal
 Denver has migrated to a new data platform - this script uses the updated URLs
 """
 
+import asyncio
+import httpx
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import requests
-import json
-from datetime import datetime
+import ijson
+import shutil
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import os
-import time
 
 # Configuration
 DATA_DIR = "data"
@@ -38,57 +44,191 @@ crime_api_url = "https://www.denvergov.org/resource/s8hx-dx8s.json"
 # Socrata limits to 50K records per request, so we'll need to paginate
 params = {
     "$limit": 50000,
-    "$offset": 0,
     "$order": "first_occurrence_date DESC"
 }
 
-try:
-    print(f"Fetching from Socrata API: {crime_api_url}")
-    print("Note: This may take a few minutes for large datasets...")
+# Pages fetched at once; bounded so the API isn't flooded
+MAX_CONCURRENT_PAGES = 4
+# Tries per page before it is counted as failed (timeouts, dropped
+# connections, rate limiting and server errors)
+PAGE_ATTEMPTS = 3
+
+# Crime fields kept in the raw Parquet, named and typed as 02_clean_data.py
+# reads them (see CRIME_COLUMN_TYPES there). Socrata returns lowercase,
+# all-text fields and leaves out nulls, so every page is conformed to this
+# fixed schema rather than to whichever page happens to arrive first.
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+CRIME_SCHEMA = pa.schema([
+    ('INCIDENT_ID', pa.int64()),
+    ('OFFENSE_TYPE_ID', CATEGORY),
+    ('OFFENSE_CATEGORY_ID', CATEGORY),
+    ('INCIDENT_ADDRESS', pa.string()),
+    ('GEO_LAT', pa.float32()),
+    ('GEO_LON', pa.float32()),
+    ('NEIGHBORHOOD_ID', CATEGORY),
+    ('DISTRICT_ID', CATEGORY),
+    ('IS_CRIME', pa.int8()),
+    ('IS_TRAFFIC', pa.int8()),
+    ('FIRST_OCCURRENCE_DATE', pa.string()),
+    ('REPORTED_DATE', pa.string())
+])
+API_CRIME_SCHEMA = pa.schema([(field.name.lower(), pa.string()) for field in CRIME_SCHEMA])
+
+# Text that casts cleanly to each kind of number
+INTEGER_PATTERN = r'^[+-]?\d+$'
+FLOAT_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+
+def crime_table(batch):
+    """Convert one page of API records to an Arrow table with CRIME_SCHEMA
     
-    all_records = []
-    offset = 0
-    batch_size = 50000
+    Empty text and numbers that don't parse (e.g. "1.0" for an integer)
+    become nulls rather than failing the whole page.
+    """
+    table = pa.Table.from_pylist(batch, schema=API_CRIME_SCHEMA)
+    columns = []
+    for column, field in zip(table.columns, CRIME_SCHEMA):
+        if pa.types.is_integer(field.type):
+            valid = pc.match_substring_regex(column, INTEGER_PATTERN)
+        elif pa.types.is_floating(field.type):
+            valid = pc.match_substring_regex(column, FLOAT_PATTERN)
+        else:
+            valid = pc.not_equal(column, '')
+        column = pc.if_else(valid, column, pa.scalar(None, pa.string()))
+        columns.append(column.cast(field.type))
+    return pa.table(columns, schema=CRIME_SCHEMA)
+
+def retry_delay(response, attempt):
+    """Seconds to wait before retrying a page
     
-    while True:
-        params["$offset"] = offset
-        print(f"  Fetching batch starting at offset {offset}...")
-        
-        response = requests.get(crime_api_url, params=params, timeout=60)
-        
-        if response.status_code != 200:
-            print(f"  Status code: {response.status_code}")
-            print(f"  Response: {response.text[:200]}")
-            break
-        
-        batch = response.json()
-        
-        if not batch:
-            print(f"  No more records found")
-            break
+    Follows the server's Retry-After (seconds or an HTTP date) when the
+    response has one, otherwise backs off exponentially.
+    """
+    retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+    if retry_after.isdigit():
+        return int(retry_after)
+    try:
+        return max(0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return 2 ** attempt
+
+async def download_crime_pages(raw_crime_path, batch_size):
+    """Fetch all crime pages concurrently, appending each to Parquet as it arrives
+    
+    Each batch is written straight to Parquet and dropped, so peak memory stays
+    at a few batches instead of the whole dataset. Pages go to a temporary
+    file that only replaces raw_crime_path once every page has arrived, since
+    a partial download would leave gaps spread across the date range.
+    Returns (total_records, columns, date_min, date_max, failed_pages).
+    """
+    total_records = 0
+    columns = CRIME_SCHEMA.names
+    date_min = None
+    date_max = None
+    failed_pages = 0
+    
+    async with httpx.AsyncClient(timeout=60) as client:
+        # Get the row count first so every page offset is known up front
+        count_response = await client.get(crime_api_url, params={"$select": "count(*)"})
+        count_response.raise_for_status()
+        total_rows = int(next(iter(count_response.json()[0].values())))
+        offsets = range(0, total_rows, batch_size)
+        print(f"  {total_rows:,} records available across {len(offsets)} pages")
         
-        all_records.extend(batch)
-        print(f"  Got {len(batch)} records (total so far: {len(all_records):,})")
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
         
-        if len(batch) < batch_size:
-            # Last batch
-            break
+        async def fetch_page(offset):
+            """Fetch one page of records, or None if it could not be fetched
+            
+            Transport errors, rate limiting (429) and server errors (5xx) are
+            retried after a delay; any other error status fails the page at once.
+            """
+            for attempt in range(1, PAGE_ATTEMPTS + 1):
+                response = None
+                try:
+                    async with semaphore:
+                        print(f"  Fetching batch starting at offset {offset}...")
+                        response = await client.get(crime_api_url, params={**params, "$offset": offset})
+                except httpx.HTTPError as e:
+                    print(f"  {type(e).__name__} at offset {offset} (attempt {attempt} of {PAGE_ATTEMPTS}): {e}")
+                else:
+                    if response.status_code == 200:
+                        return response.json()
+                    print(f"  Status code {response.status_code} at offset {offset} (attempt {attempt} of {PAGE_ATTEMPTS})")
+                    print(f"  Response: {response.text[:200]}")
+                    if response.status_code != 429 and response.status_code < 500:
+                        return None
+                if attempt < PAGE_ATTEMPTS:
+                    await asyncio.sleep(retry_delay(response, attempt))
+            return None
         
-        offset += batch_size
-        time.sleep(1)  # Be nice to the API
+        partial_path = f"{raw_crime_path}.part"
+        writer = None
+        try:
+            for page in asyncio.as_completed([fetch_page(offset) for offset in offsets]):
+                batch = await page
+                if batch is None:
+                    failed_pages += 1
+                    continue
+                if not batch:
+                    continue
+                
+                try:
+                    table = crime_table(batch)
+                except pa.ArrowException as e:
+                    print(f"  Could not convert a page of {len(batch)} records: {e}")
+                    failed_pages += 1
+                    continue
+                if writer is None:
+                    writer = pq.ParquetWriter(partial_path, CRIME_SCHEMA, compression='zstd')
+                writer.write_table(table)
+                
+                batch_range = pc.min_max(table['FIRST_OCCURRENCE_DATE'])
+                batch_min = batch_range['min'].as_py()
+                batch_max = batch_range['max'].as_py()
+                if batch_min is not None and (date_min is None or batch_min < date_min):
+                    date_min = batch_min
+                if batch_max is not None and (date_max is None or batch_max > date_max):
+                    date_max = batch_max
+                
+                batch_count = len(batch)
+                total_records += batch_count
+                del batch, table
+                print(f"  Got {batch_count} records (total so far: {total_records:,})")
+        except BaseException:
+            if writer is not None:
+                writer.close()
+                os.remove(partial_path)
+            raise
     
-    if all_records:
-        crime_df = pd.DataFrame(all_records)
-        
-        # Save raw data
-        raw_crime_path = f"{RAW_DIR}/crime_raw.csv"
-        crime_df.to_csv(raw_crime_path, index=False)
-        
-        print(f"✅ Downloaded {len(crime_df):,} crime records")
+    if writer is not None:
+        writer.close()
+        if failed_pages:
+            os.remove(partial_path)
+        else:
+            os.replace(partial_path, raw_crime_path)
+    
+    return total_records, columns, date_min, date_max, failed_pages
+
+try:
+    print(f"Fetching from Socrata API: {crime_api_url}")
+    print("Note: This may take a few minutes for large datasets...")
+    
+    raw_crime_path = f"{RAW_DIR}/crime_raw.parquet"
+    batch_size = params["$limit"]
+    
+    total_records, columns, date_min, date_max, failed_pages = asyncio.run(
+        download_crime_pages(raw_crime_path, batch_size)
+    )
+    if failed_pages:
+        print(f"❌ {failed_pages} page(s) failed, so {raw_crime_path} was not updated")
+        print("   Re-run this script to download the complete dataset")
+        print()
+    elif total_records:
+        print(f"✅ Downloaded {total_records:,} crime records")
         print(f"   Saved to: {raw_crime_path}")
-        if 'first_occurrence_date' in crime_df.columns:
-            print(f"   Date range: {crime_df['first_occurrence_date'].min()} to {crime_df['first_occurrence_date'].max()}")
-        print(f"   Columns: {', '.join(crime_df.columns[:5])}... ({len(crime_df.columns)} total)")
+        if date_min is not None:
+            print(f"   Date range: {date_min} to {date_max}")
+        print(f"   Columns: {', '.join(columns[:5])}... ({len(columns)} total)")
         print()
     else:
         print("❌ No crime data retrieved")
@@ -170,39 +310,37 @@ neighborhoods_url = "https://www.denvergov.org/media/gis/DataCatalog/statistical
 try:
     print(f"Fetching from: {neighborhoods_url}")
     
-    response = requests.get(neighborhoods_url, timeout=30)
-    
-    if response.status_code == 200:
-        # Try to parse as JSON
-        neighborhoods_data = response.json()
-        
-        # Save raw GeoJSON
-        raw_neighborhoods_path = f"{RAW_DIR}/neighborhoods_raw.geojson"
-        with open(raw_neighborhoods_path, 'w') as f:
-            json.dump(neighborhoods_data, f)
-        
-        # Also create a simple CSV
-        if 'features' in neighborhoods_data:
-            neighborhoods_list = []
-            for feature in neighborhoods_data['features']:
-                props = feature['properties']
-                neighborhoods_list.append({
-                    'NBHD_ID': props.get('NBHD_ID'),
-                    'NBHD_NAME': props.get('NBHD_NAME'),
-                    'SUM_AREA': props.get('SUM_AREA')
-                })
+    with requests.get(neighborhoods_url, stream=True, timeout=30) as response:
+        if response.status_code == 200:
+            # Save raw GeoJSON by streaming the body straight to disk
+            raw_neighborhoods_path = f"{RAW_DIR}/neighborhoods_raw.geojson"
+            response.raw.decode_content = True
+            with open(raw_neighborhoods_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f)
             
-            neighborhoods_df = pd.DataFrame(neighborhoods_list)
-            neighborhoods_csv_path = f"{RAW_DIR}/neighborhoods_list.csv"
-            neighborhoods_df.to_csv(neighborhoods_csv_path, index=False)
+            # Also create a simple CSV, reading one feature's properties at a time
+            with open(raw_neighborhoods_path, 'rb') as f:
+                neighborhoods_list = [
+                    {
+                        'NBHD_ID': props.get('NBHD_ID'),
+                        'NBHD_NAME': props.get('NBHD_NAME'),
+                        'SUM_AREA': props.get('SUM_AREA')
+                    }
+                    for props in ijson.items(f, 'features.item.properties', use_float=True)
+                ]
             
-            print(f"✅ Downloaded {len(neighborhoods_data['features'])} neighborhoods")
-            print(f"   Saved GeoJSON to: {raw_neighborhoods_path}")
-            print(f"   Saved CSV list to: {neighborhoods_csv_path}")
+            if neighborhoods_list:
+                neighborhoods_df = pd.DataFrame(neighborhoods_list)
+                neighborhoods_csv_path = f"{RAW_DIR}/neighborhoods_list.csv"
+                neighborhoods_df.to_csv(neighborhoods_csv_path, index=False)
+                
+                print(f"✅ Downloaded {len(neighborhoods_list)} neighborhoods")
+                print(f"   Saved GeoJSON to: {raw_neighborhoods_path}")
+                print(f"   Saved CSV list to: {neighborhoods_csv_path}")
+                print()
+        else:
+            print(f"❌ HTTP {response.status_code}")
             print()
-    else:
-        print(f"❌ HTTP {response.status_code}")
-        print()
         
 except Exception as e:
     print(f"❌ Error downloading neighborhood data: {e}")
@@ -221,7 +359,7 @@ print()
 print("1. Go to: https://www.denvergov.org/opendata")
 print("2. Search for 'crime'")
 print("3. Download the CSV file")
-print("4. Save as: data/raw/crime_raw.csv")
+print("4. Save as: data/raw/crime_raw.csv (or crime_raw.parquet)")
 print()
 print("5. Search for '311' or 'service requests'")
 print("6. Download the CSV file")
@@ -240,13 +378,13 @@ print("DOWNLOAD SUMMARY")
 print("=" * 80)
 print()
 print("Files in data/raw/:")
-for root, dirs, files in os.walk(RAW_DIR):
-    for file in files:
-        filepath = os.path.join(root, file)
-        size = os.path.getsize(filepath) / (1024 * 1024)  # MB
-        print(f"  - {file} ({size:.2f} MB)")
+with os.scandir(RAW_DIR) as entries:
+    for entry in entries:
+        if entry.is_file():
+            size = entry.stat().st_size / (1024 * 1024)  # MB
+            print(f"  - {entry.name} ({size:.2f} MB)")
 print()
-print("If you have at least crime_raw.csv and 311_requests_raw.csv,")
+print("If you have at least crime_raw.parquet (or .csv) and 311_requests_raw.csv,")
 print("you can proceed to: python scripts/02_clean_data.py")
 print()
 print("=" * 80)
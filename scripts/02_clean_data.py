@@ -8,262 +8,496 @@ Cleans and prepares Denver crime and 311 data for correlation analysis.
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime
+import io
 import os
+import re
 
 # Configuration
 DATA_DIR = "data"
 RAW_DIR = f"{DATA_DIR}/raw"
 PROCESSED_DIR = f"{DATA_DIR}/processed"
 
-print("=" * 80)
-print("ETHICA.DESIGN - DATA CLEANING")
-print("=" * 80)
-print()
+# Raw crime columns used downstream, with compact types so the raw file
+# never has to be held with pandas' int64/float64/object defaults.
+# Dictionary columns come out of Arrow as pandas categoricals; the date
+# columns are parsed by pandas once non-crime rows are dropped.
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+CRIME_COLUMN_TYPES = {
+    'INCIDENT_ID': pa.int64(),
+    'OFFENSE_TYPE_ID': CATEGORY,
+    'OFFENSE_CATEGORY_ID': CATEGORY,
+    'INCIDENT_ADDRESS': pa.string(),
+    'GEO_LAT': pa.float32(),
+    'GEO_LON': pa.float32(),
+    'NEIGHBORHOOD_ID': CATEGORY,
+    'DISTRICT_ID': CATEGORY,
+    'IS_CRIME': pa.int8(),
+    'IS_TRAFFIC': pa.int8(),
+    'FIRST_OCCURRENCE_DATE': pa.string(),
+    'REPORTED_DATE': pa.string()
+}
+# Bytes of CSV parsed (across all cores) per batch
+CRIME_BLOCK_SIZE = 64 * 1024 * 1024
 
-# ============================================================================
-# CLEAN CRIME DATA
-# ============================================================================
+# 311 column names vary by dataset version, so columns are matched by pattern
+DATE_COLUMN_PATTERN = re.compile(r'DATE|TIME', re.IGNORECASE)
+DATE_ROLE_PATTERNS = [
+    (re.compile(r'OPEN|CREATE|SUBMIT', re.IGNORECASE), 'opened'),
+    (re.compile(r'CLOSE|RESOLVE|COMPLETE', re.IGNORECASE), 'closed')
+]
+# Checked in order; the first pattern that matches a column names it
+# Note: Denver 311 data uses "Case Summary" as the request type/category
+RENAME_PATTERNS = [
+    (re.compile(r'CASE_ID|SERVICE_ID|OBJECTID', re.IGNORECASE), 'case_id'),
+    (re.compile(r'^Case Summary$'), 'case_type'),
+    (re.compile(r'CASE_TYPE|SERVICE_TYPE|REQUEST_TYPE', re.IGNORECASE), 'case_type'),
+    (re.compile(r'STATUS', re.IGNORECASE), 'status'),
+    (re.compile(r'(?=.*NEIGHBORHOOD)(?=.*NAME)', re.IGNORECASE), 'neighborhood'),
+    (re.compile(r'^Neighborhood$'), 'neighborhood'),
+    (re.compile(r'^(latitude|LATITUDE|Latitude)$'), 'latitude'),
+    (re.compile(r'^(longitude|LONGITUDE|Longitude)$'), 'longitude')
+]
 
-print("🧹 CLEANING CRIME DATA...")
-print("-" * 80)
+STREETLIGHT_PATTERN = re.compile(r'LIGHT|STREET|LAMP|ILLUMINATION', re.IGNORECASE)
 
-try:
-    crime_df = pd.read_csv(f"{RAW_DIR}/crime_raw.csv")
-    print(f"Loaded {len(crime_df):,} crime records")
-    
-    # Parse dates
-    crime_df['first_occurrence_date'] = pd.to_datetime(
-        crime_df['FIRST_OCCURRENCE_DATE'], 
-        errors='coerce'
-    )
-    crime_df['reported_date'] = pd.to_datetime(
-        crime_df['REPORTED_DATE'], 
-        errors='coerce'
-    )
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def first_match(col, patterns):
+    """Return the label of the first pattern matching a column name, or None"""
+    return next((label for pattern, label in patterns if pattern.search(col)), None)
+
+def downcast_frame(df):
+    """Shrink columns to the smallest dtype that holds their values
     
-    # Extract useful time components
-    crime_df['year'] = crime_df['first_occurrence_date'].dt.year
-    crime_df['month'] = crime_df['first_occurrence_date'].dt.month
-    crime_df['day_of_week'] = crime_df['first_occurrence_date'].dt.day_name()
-    crime_df['hour'] = crime_df['first_occurrence_date'].dt.hour
+    Integers are downcast, and text columns with mostly repeated values
+    become categoricals. Integers stay signed so later arithmetic on them
+    can't wrap around. Floats are left alone: measures such as response
+    times feed published averages and need full precision.
+    """
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes('object').columns:
+        if df[col].nunique() < 0.5 * len(df):
+            df[col] = df[col].astype('category')
+    return df
+
+def time_components(dates):
+    """Split datetimes into year, month, day of week and hour columns
     
-    # Standardize column names
-    crime_df.rename(columns={
-        'INCIDENT_ID': 'incident_id',
-        'OFFENSE_TYPE_ID': 'offense_type',
-        'OFFENSE_CATEGORY_ID': 'offense_category',
-        'INCIDENT_ADDRESS': 'address',
-        'GEO_LAT': 'latitude',
-        'GEO_LON': 'longitude',
-        'NEIGHBORHOOD_ID': 'neighborhood',
-        'DISTRICT_ID': 'district',
-        'IS_CRIME': 'is_crime',
-        'IS_TRAFFIC': 'is_traffic'
-    }, inplace=True)
+    Works from one numpy datetime64 array truncated to successively coarser
+    units, rather than a separate pandas .dt calendar conversion per column.
+    Missing dates give missing components.
+    """
+    hours = dates.to_numpy(dtype='datetime64[h]')
+    days = hours.astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    years = months.astype('datetime64[Y]')
+    missing = np.isnat(hours)
     
-    # Filter to actual crimes (not just incidents)
-    crime_df = crime_df[crime_df['is_crime'] == 1].copy()
+    fields = {
+        'year': years.astype(np.int64) + 1970,
+        'month': (months - years).astype(np.int64) + 1,
+        'hour': (hours - days).astype(np.int64)
+    }
+    if missing.any():
+        fields = {name: np.where(missing, np.nan, values) for name, values in fields.items()}
+    components = pd.DataFrame(fields, index=dates.index)
     
-    # Remove records with missing location data
-    initial_count = len(crime_df)
-    crime_df = crime_df.dropna(subset=['latitude', 'longitude', 'neighborhood'])
-    removed = initial_count - len(crime_df)
+    # 1970-01-01 (day 0) was a Thursday
+    day_codes = np.where(missing, -1, (days.astype(np.int64) + 3) % 7)
+    components.insert(2, 'day_of_week', pd.Categorical.from_codes(day_codes, categories=DAY_NAMES))
+    return components
+
+def read_crime_parquet(path):
+    """Read the raw crime Parquet with the CRIME_COLUMN_TYPES names and types
     
-    print(f"✅ Cleaned crime data:")
-    print(f"   - Parsed dates and extracted time components")
-    print(f"   - Filtered to actual crimes: {len(crime_df):,} records")
-    print(f"   - Removed {removed:,} records with missing location data")
-    print(f"   - Date range: {crime_df['first_occurrence_date'].min()} to {crime_df['first_occurrence_date'].max()}")
+    Downloads made before the schema was fixed kept Socrata's lowercase,
+    all-text fields, so columns are matched regardless of case and cast.
+    Empty text is missing, as in the CSV reader.
+    """
+    file_columns = {name.upper(): name for name in pq.read_schema(path).names}
+    table = pq.read_table(path, columns=[file_columns[col] for col in CRIME_COLUMN_TYPES])
+    columns = []
+    for column, column_type in zip(table.columns, CRIME_COLUMN_TYPES.values()):
+        if pa.types.is_string(column.type):
+            column = pc.if_else(pc.equal(column, ''), pa.scalar(None, pa.string()), column)
+        columns.append(column.cast(column_type))
+    return pa.table(columns, names=list(CRIME_COLUMN_TYPES)).to_pandas()
+
+def newer_file(first, second):
+    """Whichever of two paths exists and was modified last, or None"""
+    existing = [path for path in (first, second) if os.path.exists(path)]
+    return max(existing, key=os.path.getmtime, default=None)
+
+def filter_crime_rows(chunk):
+    """Keep actual crimes (not just incidents) that have location data"""
+    crimes = chunk[chunk['IS_CRIME'] == 1]
+    located = crimes.dropna(subset=['GEO_LAT', 'GEO_LON', 'NEIGHBORHOOD_ID'])
+    return located, len(crimes)
+
+# ============================================================================
+# CLEAN CRIME DATA
+# ============================================================================
+
+def clean_crime():
+    """Clean the raw crime data and save it to the processed folder
     
-    # Save cleaned data
-    cleaned_crime_path = f"{PROCESSED_DIR}/crime_cleaned.csv"
-    crime_df.to_csv(cleaned_crime_path, index=False)
-    print(f"   - Saved to: {cleaned_crime_path}")
-    print()
+    Returns the columns used to place streetlight requests in neighborhoods,
+    or None if the crime data could not be cleaned.
+    """
+    print("🧹 CLEANING CRIME DATA...")
+    print("-" * 80)
     
-except Exception as e:
-    print(f"❌ Error cleaning crime data: {e}")
-    print()
+    try:
+        # Either download script may have run last, so use the newer raw file
+        crime_columns = list(CRIME_COLUMN_TYPES)
+        crime_path = newer_file(f"{RAW_DIR}/crime_raw.parquet", f"{RAW_DIR}/crime_raw.csv")
+        if crime_path is not None and crime_path.endswith('.parquet'):
+            crime_chunks = [read_crime_parquet(crime_path)]
+        else:
+            # Stream the CSV through Arrow's multi-threaded reader so rows are
+            # filtered before the whole file is in memory
+            crime_reader = pa_csv.open_csv(
+                f"{RAW_DIR}/crime_raw.csv",
+                read_options=pa_csv.ReadOptions(block_size=CRIME_BLOCK_SIZE),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=crime_columns,
+                    column_types=CRIME_COLUMN_TYPES,
+                    strings_can_be_null=True
+                )
+            )
+            crime_chunks = (batch.to_pandas() for batch in crime_reader)
+        
+        total_count = 0
+        crime_count = 0
+        kept_chunks = []
+        for chunk in crime_chunks:
+            total_count += len(chunk)
+            kept, chunk_crimes = filter_crime_rows(chunk)
+            crime_count += chunk_crimes
+            kept_chunks.append(kept)
+        crime_df = pd.concat(kept_chunks, ignore_index=True)
+        del kept_chunks
+        
+        # Chunks can see different category sets, which concat widens to object;
+        # also drop categories that only appeared on filtered-out rows. Arrow keeps
+        # categories in order of appearance, so sort them to keep groupby output
+        # in the same (alphabetical) order as before
+        for col, column_type in CRIME_COLUMN_TYPES.items():
+            if column_type == CATEGORY:
+                categories = crime_df[col].astype('category').cat.remove_unused_categories()
+                crime_df[col] = categories.cat.reorder_categories(categories.cat.categories.sort_values())
+        print(f"Loaded {total_count:,} crime records")
+        
+        # Parse dates (only for rows that survived the filter)
+        for col in ['FIRST_OCCURRENCE_DATE', 'REPORTED_DATE']:
+            crime_df[col] = pd.to_datetime(crime_df[col], errors='coerce')
+        crime_df['first_occurrence_date'] = crime_df['FIRST_OCCURRENCE_DATE']
+        crime_df['reported_date'] = crime_df['REPORTED_DATE']
+        
+        # Extract useful time components
+        crime_df = crime_df.join(time_components(crime_df['first_occurrence_date']))
+        
+        # Standardize column names
+        crime_df.rename(columns={
+            'INCIDENT_ID': 'incident_id',
+            'OFFENSE_TYPE_ID': 'offense_type',
+            'OFFENSE_CATEGORY_ID': 'offense_category',
+            'INCIDENT_ADDRESS': 'address',
+            'GEO_LAT': 'latitude',
+            'GEO_LON': 'longitude',
+            'NEIGHBORHOOD_ID': 'neighborhood',
+            'DISTRICT_ID': 'district',
+            'IS_CRIME': 'is_crime',
+            'IS_TRAFFIC': 'is_traffic'
+        }, inplace=True)
+        
+        removed = crime_count - len(crime_df)
+        
+        print(f"✅ Cleaned crime data:")
+        print(f"   - Parsed dates and extracted time components")
+        print(f"   - Filtered to actual crimes: {len(crime_df):,} records")
+        print(f"   - Removed {removed:,} records with missing location data")
+        print(f"   - Date range: {crime_df['first_occurrence_date'].min()} to {crime_df['first_occurrence_date'].max()}")
+        
+        # Save cleaned data
+        crime_df = downcast_frame(crime_df)
+        cleaned_crime_path = f"{PROCESSED_DIR}/crime_cleaned.parquet"
+        crime_df.to_parquet(cleaned_crime_path, index=False, compression='zstd', engine='pyarrow')
+        print(f"   - Saved to: {cleaned_crime_path}")
+        print()
+        
+        return crime_df[['neighborhood', 'latitude', 'longitude']]
+        
+    except Exception as e:
+        print(f"❌ Error cleaning crime data: {e}")
+        print()
+        return None
 
 # ============================================================================
 # CLEAN 311 SERVICE REQUEST DATA
 # ============================================================================
 
-print("🧹 CLEANING 311 SERVICE REQUEST DATA...")
-print("-" * 80)
-
-try:
-    service_311_df = pd.read_csv(f"{RAW_DIR}/311_requests_raw.csv")
-    print(f"Loaded {len(service_311_df):,} 311 service requests")
-    
-    # Identify date columns (they vary by dataset version)
-    date_columns = [col for col in service_311_df.columns if 'DATE' in col.upper() or 'TIME' in col.upper()]
-    print(f"   Date columns found: {date_columns}")
-    
-    # Common column patterns in Denver 311 data
-    # Try to find opened/closed date columns
-    opened_col = None
-    closed_col = None
-    
-    for col in service_311_df.columns:
-        col_upper = col.upper()
-        if 'OPEN' in col_upper or 'CREATE' in col_upper or 'SUBMIT' in col_upper:
-            if 'DATE' in col_upper or 'TIME' in col_upper:
-                opened_col = col
-        if 'CLOSE' in col_upper or 'RESOLVE' in col_upper or 'COMPLETE' in col_upper:
-            if 'DATE' in col_upper or 'TIME' in col_upper:
-                closed_col = col
-    
-    print(f"   Identified opened date column: {opened_col}")
-    print(f"   Identified closed date column: {closed_col}")
-    
-    # Parse dates if found
-    if opened_col:
-        service_311_df['opened_date'] = pd.to_datetime(
-            service_311_df[opened_col], 
-            errors='coerce'
-        )
-        service_311_df['year'] = service_311_df['opened_date'].dt.year
-        service_311_df['month'] = service_311_df['opened_date'].dt.month
-    
-    if closed_col:
-        service_311_df['closed_date'] = pd.to_datetime(
-            service_311_df[closed_col], 
-            errors='coerce'
-        )
-        # Calculate response time in days
-        service_311_df['response_time_days'] = (
-            service_311_df['closed_date'] - service_311_df['opened_date']
-        ).dt.total_seconds() / (24 * 3600)
+def clean_311_raw():
+    """Clean the raw 311 data and save it to the processed folder
     
-    # Standardize column names
-    # Note: Denver 311 data uses "Case Summary" as the request type/category
-    rename_map = {}
-    for col in service_311_df.columns:
-        col_upper = col.upper()
-        if 'CASE_ID' in col_upper or 'SERVICE_ID' in col_upper or 'OBJECTID' in col_upper:
-            rename_map[col] = 'case_id'
-        elif col == 'Case Summary':
-            # Case Summary contains the request category/type in Denver 311 data
-            rename_map[col] = 'case_type'
-        elif 'CASE_TYPE' in col_upper or 'SERVICE_TYPE' in col_upper or 'REQUEST_TYPE' in col_upper:
-            rename_map[col] = 'case_type'
-        elif 'STATUS' in col_upper or col == 'Case Status':
-            rename_map[col] = 'status'
-        elif 'NEIGHBORHOOD' in col_upper and 'NAME' in col_upper:
-            rename_map[col] = 'neighborhood'
-        elif col == 'Neighborhood':
-            rename_map[col] = 'neighborhood'
-        elif col == 'latitude' or col == 'LATITUDE' or col == 'Latitude':
-            rename_map[col] = 'latitude'
-        elif col == 'longitude' or col == 'LONGITUDE' or col == 'Longitude':
-            rename_map[col] = 'longitude'
-
-    service_311_df.rename(columns=rename_map, inplace=True)
+    Returns the streetlight-related requests, which still need neighborhoods
+    assigned, or None if they could not be identified.
+    """
+    print("🧹 CLEANING 311 SERVICE REQUEST DATA...")
+    print("-" * 80)
     
-    # Filter for streetlight-related requests (our primary focus for MVP)
-    if 'case_type' in service_311_df.columns:
-        # Find streetlight-related requests
-        # Convert to string first to handle any null/mixed type values
-        service_311_df['case_type'] = service_311_df['case_type'].astype(str)
-
-        streetlight_keywords = ['LIGHT', 'STREET', 'LAMP', 'ILLUMINATION']
-        streetlight_mask = service_311_df['case_type'].str.upper().str.contains(
-            '|'.join(streetlight_keywords),
-            na=False
-        )
+    try:
+        # Read with Arrow's multi-threaded reader, keeping date columns as
+        # text for the parsing below. Arrow widens a column's inferred type
+        # when a later block needs it, so mixed-type columns stay
+        # consistently typed across the whole file when written to Parquet
+        raw_311_path = f"{RAW_DIR}/311_requests_raw.csv"
+        raw_311_columns = pd.read_csv(raw_311_path, nrows=0).columns
+        service_311_df = pa_csv.read_csv(
+            raw_311_path,
+            convert_options=pa_csv.ConvertOptions(
+                column_types={
+                    col: pa.string() for col in raw_311_columns if DATE_COLUMN_PATTERN.search(col)
+                },
+                strings_can_be_null=True
+            )
+        ).to_pandas()
+        print(f"Loaded {len(service_311_df):,} 311 service requests")
         
-        streetlight_df = service_311_df[streetlight_mask].copy()
+        # Identify date columns (they vary by dataset version)
+        date_columns = [col for col in service_311_df.columns if DATE_COLUMN_PATTERN.search(col)]
+        print(f"   Date columns found: {date_columns}")
         
-        print(f"✅ Cleaned 311 data:")
-        print(f"   - Total requests: {len(service_311_df):,}")
-        print(f"   - Streetlight-related: {len(streetlight_df):,}")
+        # Common column patterns in Denver 311 data
+        # Try to find opened/closed date columns (the last match wins)
+        date_roles = {
+            role: col
+            for col in date_columns
+            for pattern, role in DATE_ROLE_PATTERNS
+            if pattern.search(col)
+        }
+        opened_col = date_roles.get('opened')
+        closed_col = date_roles.get('closed')
         
+        print(f"   Identified opened date column: {opened_col}")
+        print(f"   Identified closed date column: {closed_col}")
+        
+        # Parse dates if found
         if opened_col:
-            print(f"   - Date range: {service_311_df['opened_date'].min()} to {service_311_df['opened_date'].max()}")
+            service_311_df['opened_date'] = pd.to_datetime(
+                service_311_df[opened_col], 
+                errors='coerce'
+            )
+            service_311_df['year'] = service_311_df['opened_date'].dt.year
+            service_311_df['month'] = service_311_df['opened_date'].dt.month
+        
+        if closed_col:
+            service_311_df['closed_date'] = pd.to_datetime(
+                service_311_df[closed_col], 
+                errors='coerce'
+            )
+            # Calculate response time in days
+            service_311_df['response_time_days'] = (
+                service_311_df['closed_date'] - service_311_df['opened_date']
+            ).dt.total_seconds() / (24 * 3600)
         
-        # Show top request types
+        # Standardize column names
+        rename_map = {}
+        for col in service_311_df.columns:
+            target = first_match(col, RENAME_PATTERNS)
+            if target:
+                rename_map[col] = target
+    
+        service_311_df.rename(columns=rename_map, inplace=True)
+        
+        # Filter for streetlight-related requests (our primary focus for MVP)
         if 'case_type' in service_311_df.columns:
-            print(f"\n   Top 10 Request Types:")
-            top_types = service_311_df['case_type'].value_counts().head(10)
-            for service_type, count in top_types.items():
-                print(f"     - {service_type}: {count:,}")
+            # Find streetlight-related requests
+            # Match each distinct request type once, then map back to rows via the
+            # category codes; nulls have code -1, which picks up the trailing False
+            case_types = service_311_df['case_type'].astype('string').astype('category')
+            service_311_df['case_type'] = case_types
+            
+            is_streetlight_type = np.array(
+                [bool(STREETLIGHT_PATTERN.search(case_type)) for case_type in case_types.cat.categories] + [False]
+            )
+            streetlight_mask = is_streetlight_type[case_types.cat.codes.to_numpy()]
+            
+            streetlight_df = service_311_df[streetlight_mask].copy()
+            
+            print(f"✅ Cleaned 311 data:")
+            print(f"   - Total requests: {len(service_311_df):,}")
+            print(f"   - Streetlight-related: {len(streetlight_df):,}")
+            
+            if opened_col:
+                print(f"   - Date range: {service_311_df['opened_date'].min()} to {service_311_df['opened_date'].max()}")
+            
+            # Show top request types
+            if 'case_type' in service_311_df.columns:
+                print(f"\n   Top 10 Request Types:")
+                top_types = service_311_df['case_type'].value_counts().head(10)
+                for service_type, count in top_types.items():
+                    print(f"     - {service_type}: {count:,}")
+            
+            # Save cleaned data; streetlight requests are saved once they
+            # have been assigned neighborhoods
+            service_311_df = downcast_frame(service_311_df)
+            cleaned_311_path = f"{PROCESSED_DIR}/311_requests_cleaned.parquet"
+            service_311_df.to_parquet(cleaned_311_path, index=False, compression='zstd', engine='pyarrow')
+            print(f"\n   - Saved all 311 requests to: {cleaned_311_path}")
+            print()
+            
+            return streetlight_df
+        else:
+            print(f"⚠️  Could not identify case_type column for filtering")
+            print(f"   Available columns: {list(service_311_df.columns)}")
+            print()
+            return None
         
-        # Assign neighborhoods to streetlight requests using crime data spatial reference
-        print(f"\n   Assigning neighborhoods to streetlight requests...")
-        try:
-            # Load crime data which has neighborhood assignments
-            if os.path.exists(f"{PROCESSED_DIR}/crime_cleaned.csv"):
-                crime_ref = pd.read_csv(f"{PROCESSED_DIR}/crime_cleaned.csv")
-                crime_ref = crime_ref[crime_ref['neighborhood'].notna() &
-                                     crime_ref['latitude'].notna() &
-                                     crime_ref['longitude'].notna()].copy()
-
-                # For each streetlight request with lat/lon, find nearest crime neighborhood
-                from scipy.spatial import cKDTree
-
-                # Build KDTree from crime locations
-                crime_coords = crime_ref[['latitude', 'longitude']].values
-                tree = cKDTree(crime_coords)
-
-                # Find neighborhoods for streetlights with coordinates
-                mask = streetlight_df['latitude'].notna() & streetlight_df['longitude'].notna()
-                streetlight_coords = streetlight_df.loc[mask, ['latitude', 'longitude']].values
-
-                if len(streetlight_coords) > 0:
-                    distances, indices = tree.query(streetlight_coords)
-                    assigned_neighborhoods = crime_ref.iloc[indices]['neighborhood'].values
-
-                    # Update neighborhood column for records with coordinates
-                    streetlight_df.loc[mask, 'neighborhood'] = assigned_neighborhoods
-
-                    assigned_count = streetlight_df['neighborhood'].notna().sum()
-                    print(f"     - Assigned {assigned_count} / {len(streetlight_df)} streetlight requests to neighborhoods")
-            else:
-                print(f"     - Crime data not yet processed, skipping neighborhood assignment")
-        except Exception as e:
-            print(f"     - Could not assign neighborhoods: {e}")
-
-        # Save cleaned data
-        cleaned_311_path = f"{PROCESSED_DIR}/311_requests_cleaned.csv"
-        service_311_df.to_csv(cleaned_311_path, index=False)
-        print(f"\n   - Saved all 311 requests to: {cleaned_311_path}")
-
-        streetlight_path = f"{PROCESSED_DIR}/311_streetlights_cleaned.csv"
-        streetlight_df.to_csv(streetlight_path, index=False)
-        print(f"   - Saved streetlight requests to: {streetlight_path}")
-        print()
-    else:
-        print(f"⚠️  Could not identify case_type column for filtering")
-        print(f"   Available columns: {list(service_311_df.columns)}")
+    except Exception as e:
+        print(f"❌ Error cleaning 311 data: {e}")
+        import traceback
+        traceback.print_exc()
         print()
-    
-except Exception as e:
-    print(f"❌ Error cleaning 311 data: {e}")
-    import traceback
-    traceback.print_exc()
-    print()
+        return None
 
 # ============================================================================
-# CLEANING SUMMARY
+# ASSIGN STREETLIGHT NEIGHBORHOODS
 # ============================================================================
 
-print("=" * 80)
-print("CLEANING SUMMARY")
-print("=" * 80)
-print()
-print("✅ Data successfully cleaned and saved to: ./data/processed/")
-print()
-print("Next steps:")
-print("1. Run: python scripts/03_analyze_correlations.py")
-print("2. Review: ./analysis/ folder for initial findings")
-print()
-print("Files created:")
-for root, dirs, files in os.walk(PROCESSED_DIR):
-    for file in files:
-        filepath = os.path.join(root, file)
-        size = os.path.getsize(filepath) / (1024 * 1024)  # MB
-        print(f"  - {filepath} ({size:.2f} MB)")
-print()
-print("=" * 80)
+def assign_streetlight_neighborhoods(streetlight_df, crime_ref):
+    """Give each streetlight request the neighborhood of the nearest crime and save them
+
+    crime_ref holds the columns returned by clean_crime(); when it is None,
+    the cleaned crime data from an earlier run is used instead.
+    """
+    # Assign neighborhoods to streetlight requests using crime data spatial reference
+    print(f"   Assigning neighborhoods to streetlight requests...")
+    try:
+        # Use crime data which has neighborhood assignments, as cleaned by
+        # this run when that succeeded, otherwise from an earlier run
+        if crime_ref is None and os.path.exists(f"{PROCESSED_DIR}/crime_cleaned.parquet"):
+            crime_ref = pd.read_parquet(
+                f"{PROCESSED_DIR}/crime_cleaned.parquet",
+                columns=['neighborhood', 'latitude', 'longitude']
+            )
+
+        if crime_ref is not None:
+            crime_ref = crime_ref[crime_ref['neighborhood'].notna() &
+                                 crime_ref['latitude'].notna() &
+                                 crime_ref['longitude'].notna()].copy()
+
+            # For each streetlight request with lat/lon, find nearest crime neighborhood
+            from scipy.spatial import cKDTree
+
+            # A degree of longitude is shorter than a degree of latitude,
+            # so scale longitude by cos(latitude) to make Euclidean distance
+            # in the tree match ground distance (equirectangular projection)
+            crime_coords = np.ascontiguousarray(crime_ref[['latitude', 'longitude']].to_numpy(dtype=np.float64))
+            lon_scale = np.cos(np.deg2rad(crime_coords[:, 0].mean()))
+            crime_coords[:, 1] *= lon_scale
+
+            # Build KDTree from crime locations (it stores C-contiguous
+            # float64, so passing exactly that avoids another copy)
+            tree = cKDTree(crime_coords)
+
+            # Find neighborhoods for streetlights with coordinates
+            mask = streetlight_df['latitude'].notna() & streetlight_df['longitude'].notna()
+            streetlight_coords = np.ascontiguousarray(
+                streetlight_df.loc[mask, ['latitude', 'longitude']].to_numpy(dtype=np.float64)
+            )
+            streetlight_coords[:, 1] *= lon_scale
+
+            if len(streetlight_coords) > 0:
+                distances, indices = tree.query(streetlight_coords, workers=-1)
+                assigned_neighborhoods = crime_ref.iloc[indices]['neighborhood'].values
+
+                # Update neighborhood column for records with coordinates
+                streetlight_df.loc[mask, 'neighborhood'] = assigned_neighborhoods
+
+                # Save with the crime data's categories (plus any names only
+                # the 311 data has), so later joins on neighborhood line up
+                # on category codes
+                crime_neighborhoods = crime_ref['neighborhood'].astype('category').cat.categories
+                neighborhood_dtype = pd.CategoricalDtype(crime_neighborhoods.union(
+                    pd.Index(streetlight_df['neighborhood'].dropna().unique())
+                ))
+                streetlight_df['neighborhood'] = streetlight_df['neighborhood'].astype(neighborhood_dtype)
+
+                assigned_count = streetlight_df['neighborhood'].notna().sum()
+                print(f"     - Assigned {assigned_count} / {len(streetlight_df)} streetlight requests to neighborhoods")
+        else:
+            print(f"     - Crime data not yet processed, skipping neighborhood assignment")
+    except Exception as e:
+        print(f"     - Could not assign neighborhoods: {e}")
+
+    # Save cleaned data
+    streetlight_df = downcast_frame(streetlight_df)
+    streetlight_path = f"{PROCESSED_DIR}/311_streetlights_cleaned.parquet"
+    streetlight_df.to_parquet(streetlight_path, index=False, compression='zstd', engine='pyarrow')
+    print(f"   - Saved streetlight requests to: {streetlight_path}")
+    print()
+
+def run_captured(step):
+    """Run a cleaning step in a worker, returning its result and printed output
+    
+    Output is buffered so the two cleans running side by side don't interleave
+    their progress messages.
+    """
+    with redirect_stdout(io.StringIO()) as output:
+        result = step()
+    return result, output.getvalue()
+
+def main():
+    print("=" * 80)
+    print("ETHICA.DESIGN - DATA CLEANING")
+    print("=" * 80)
+    print()
+    
+    # Crime and 311 cleaning are independent until the neighborhood
+    # assignment, so run them in separate processes
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        crime_future = executor.submit(run_captured, clean_crime)
+        service_311_future = executor.submit(run_captured, clean_311_raw)
+        
+        crime_ref, crime_output = crime_future.result()
+        print(crime_output, end='')
+        streetlight_df, service_311_output = service_311_future.result()
+        print(service_311_output, end='')
+    
+    if streetlight_df is not None:
+        assign_streetlight_neighborhoods(streetlight_df, crime_ref)
+    
+    # ========================================================================
+    # CLEANING SUMMARY
+    # ========================================================================
+    
+    print("=" * 80)
+    print("CLEANING SUMMARY")
+    print("=" * 80)
+    print()
+    print("✅ Data successfully cleaned and saved to: ./data/processed/")
+    print()
+    print("Next steps:")
+    print("1. Run: python scripts/03_analyze_correlations.py")
+    print("2. Review: ./analysis/ folder for initial findings")
+    print()
+    print("Files created:")
+    with os.scandir(PROCESSED_DIR) as entries:
+        for entry in entries:
+            if entry.is_file():
+                size = entry.stat().st_size / (1024 * 1024)  # MB
+                print(f"  - {entry.path} ({size:.2f} MB)")
+    print()
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
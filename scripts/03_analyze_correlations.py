@@ -9,17 +9,55 @@ Prepares data for AI-powered insight generation.
 
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 from scipy import stats
-import json
+import orjson
 import os
+import re
 
 # Configuration
 DATA_DIR = "data"
 PROCESSED_DIR = f"{DATA_DIR}/processed"
 ANALYSIS_DIR = "analysis"
 
+# NumPy scalars (correlations, p-values, sums) serialize without float()/bool() wrapping
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
 os.makedirs(ANALYSIS_DIR, exist_ok=True)
 
+def pearson_matrix(df, columns):
+    """Pearson r and two-sided p-values for every pair of columns
+    
+    The p-values come from the t statistic t = r * sqrt((n - 2) / (1 - r^2)),
+    which is what scipy.stats.pearsonr computes for each pair.
+    """
+    values = df[columns].to_numpy(dtype=np.float64)
+    n = len(values)
+    r = np.corrcoef(values, rowvar=False)
+    t = r * np.sqrt((n - 2) / np.clip(1 - r ** 2, 1e-12, None))
+    p = 2 * stats.t.sf(np.abs(t), n - 2)
+    return (
+        pd.DataFrame(r, index=columns, columns=columns),
+        pd.DataFrame(p, index=columns, columns=columns)
+    )
+
+def neighborhood_records(df, columns):
+    """List of {'neighborhood': ..., <renamed columns>} dicts, one per row"""
+    return (
+        df[list(columns)]
+        .rename(columns=columns)
+        .rename_axis('neighborhood')
+        .reset_index()
+        .to_dict(orient='records')
+    )
+
+def category_flag(series, pattern):
+    """Flag rows whose category matches a regex, testing each distinct value once"""
+    categorical = series.astype('category')
+    matches = np.asarray(categorical.cat.categories.str.lower().str.contains(pattern), dtype=bool)
+    # Missing values have code -1, which picks up the trailing False
+    return np.append(matches, False)[categorical.cat.codes.to_numpy()]
+
 print("=" * 80)
 print("ETHICA.DESIGN - CORRELATION ANALYSIS")
 print("Crime + Infrastructure Analysis")
@@ -34,13 +72,14 @@ print("📂 LOADING CLEANED DATA...")
 print("-" * 80)
 
 try:
-    crime_df = pd.read_csv(f"{PROCESSED_DIR}/crime_cleaned.csv")
+    crime_df = pd.read_parquet(f"{PROCESSED_DIR}/crime_cleaned.parquet")
     print(f"✅ Loaded {len(crime_df):,} crime records")
 
-    service_311_df = pd.read_csv(f"{PROCESSED_DIR}/311_requests_cleaned.csv")
-    print(f"✅ Loaded {len(service_311_df):,} total 311 requests")
+    # Only the count is used here, which the Parquet footer already records
+    total_311_requests = pq.ParquetFile(f"{PROCESSED_DIR}/311_requests_cleaned.parquet").metadata.num_rows
+    print(f"✅ Loaded {total_311_requests:,} total 311 requests")
 
-    streetlight_df = pd.read_csv(f"{PROCESSED_DIR}/311_streetlights_cleaned.csv")
+    streetlight_df = pd.read_parquet(f"{PROCESSED_DIR}/311_streetlights_cleaned.parquet")
     print(f"✅ Loaded {len(streetlight_df):,} streetlight requests")
     print()
 
@@ -56,32 +95,37 @@ except Exception as e:
 print("📊 AGGREGATING DATA BY NEIGHBORHOOD...")
 print("-" * 80)
 
-# Crime by neighborhood
-crime_by_hood = crime_df.groupby('neighborhood').agg({
-    'incident_id': 'count',  # Total crimes
-    'is_traffic': 'sum',  # Traffic crimes
-}).rename(columns={
-    'incident_id': 'total_crimes',
-    'is_traffic': 'traffic_crimes'
-})
-
-# Calculate property crime (common correlation with infrastructure)
+# Flag crime types (common correlations with infrastructure)
 property_crimes = ['theft', 'burglary', 'motor-vehicle-theft', 'larceny']
-crime_df['is_property_crime'] = crime_df['offense_category'].str.lower().str.contains(
-    '|'.join(property_crimes), 
-    na=False
-)
-property_crime_by_hood = crime_df[crime_df['is_property_crime']].groupby('neighborhood').size()
-crime_by_hood['property_crimes'] = property_crime_by_hood
-
-# Violent crime
 violent_crimes = ['assault', 'robbery', 'murder', 'sexual-assault']
-crime_df['is_violent_crime'] = crime_df['offense_category'].str.lower().str.contains(
-    '|'.join(violent_crimes), 
-    na=False
+crime_df['offense_category'] = crime_df['offense_category'].astype('category')
+crime_df['is_property_crime'] = category_flag(
+    crime_df['offense_category'],
+    re.compile('|'.join(property_crimes))
+).astype('int8')
+crime_df['is_violent_crime'] = category_flag(
+    crime_df['offense_category'],
+    re.compile('|'.join(violent_crimes))
+).astype('int8')
+
+# Give both frames the same neighborhood categories, so the grouped indexes
+# share a dtype and the merge below aligns on category codes, not strings
+if 'neighborhood' in streetlight_df.columns:
+    neighborhood_dtype = pd.CategoricalDtype(
+        crime_df['neighborhood'].astype('category').cat.categories.union(
+            streetlight_df['neighborhood'].astype('category').cat.categories
+        )
+    )
+    crime_df['neighborhood'] = crime_df['neighborhood'].astype(neighborhood_dtype)
+    streetlight_df['neighborhood'] = streetlight_df['neighborhood'].astype(neighborhood_dtype)
+
+# Crime by neighborhood, in a single pass
+crime_by_hood = crime_df.groupby('neighborhood', observed=True).agg(
+    total_crimes=('incident_id', 'count'),
+    traffic_crimes=('is_traffic', 'sum'),
+    property_crimes=('is_property_crime', 'sum'),
+    violent_crimes=('is_violent_crime', 'sum')
 )
-violent_crime_by_hood = crime_df[crime_df['is_violent_crime']].groupby('neighborhood').size()
-crime_by_hood['violent_crimes'] = violent_crime_by_hood
 
 print(f"✅ Aggregated crime data:")
 print(f"   - Neighborhoods with crime data: {len(crime_by_hood)}")
@@ -92,7 +136,7 @@ print()
 
 # 311 Streetlights by neighborhood
 if 'neighborhood' in streetlight_df.columns:
-    streetlight_by_hood = streetlight_df.groupby('neighborhood').agg({
+    streetlight_by_hood = streetlight_df.groupby('neighborhood', observed=True).agg({
         'case_id': 'count',  # Total requests
         'response_time_days': ['mean', 'median'],  # Response time
         'status': lambda x: (x.str.upper() == 'OPEN').sum()  # Pending requests
@@ -132,8 +176,17 @@ analysis_df = crime_by_hood.merge(
     how='outer'
 )
 
-# Fill NaN with 0 (neighborhoods with no streetlight requests)
-analysis_df = analysis_df.fillna(0)
+# Fill NaN with 0 (neighborhoods with no streetlight requests), column by
+# column so the counts stay integers instead of being widened to float64;
+# response times keep full float64 precision
+count_columns = [
+    'total_crimes', 'traffic_crimes', 'property_crimes', 'violent_crimes',
+    'total_streetlight_requests', 'pending_streetlight_requests'
+]
+for col in count_columns:
+    analysis_df[col] = analysis_df[col].fillna(0).astype('int32')
+for col in ['avg_response_time_days', 'median_response_time_days']:
+    analysis_df[col] = analysis_df[col].fillna(0.0)
 
 print(f"✅ Merged dataset:")
 print(f"   - Neighborhoods: {len(analysis_df)}")
@@ -149,16 +202,21 @@ print("-" * 80)
 
 correlations = {}
 
-# Correlation 1: Total crimes vs. pending streetlight requests
+# Every pair over all neighborhoods, from one correlation matrix
 if len(analysis_df) > 0:
-    corr, p_value = stats.pearsonr(
-        analysis_df['total_crimes'],
-        analysis_df['pending_streetlight_requests']
+    corr_matrix, p_matrix = pearson_matrix(
+        analysis_df,
+        ['total_crimes', 'property_crimes', 'pending_streetlight_requests']
     )
+
+# Correlation 1: Total crimes vs. pending streetlight requests
+if len(analysis_df) > 0:
+    corr = corr_matrix.loc['total_crimes', 'pending_streetlight_requests']
+    p_value = p_matrix.loc['total_crimes', 'pending_streetlight_requests']
     correlations['total_crime_vs_pending_lights'] = {
-        'correlation': float(corr),
-        'p_value': float(p_value),
-        'significant': bool(p_value < 0.05)
+        'correlation': corr,
+        'p_value': p_value,
+        'significant': p_value < 0.05
     }
     
     print(f"📈 Total Crime vs. Pending Streetlight Requests:")
@@ -169,14 +227,12 @@ if len(analysis_df) > 0:
 
 # Correlation 2: Property crimes vs. pending streetlight requests
 if len(analysis_df) > 0:
-    corr, p_value = stats.pearsonr(
-        analysis_df['property_crimes'],
-        analysis_df['pending_streetlight_requests']
-    )
+    corr = corr_matrix.loc['property_crimes', 'pending_streetlight_requests']
+    p_value = p_matrix.loc['property_crimes', 'pending_streetlight_requests']
     correlations['property_crime_vs_pending_lights'] = {
-        'correlation': float(corr),
-        'p_value': float(p_value),
-        'significant': bool(p_value < 0.05)
+        'correlation': corr,
+        'p_value': p_value,
+        'significant': p_value < 0.05
     }
     
     print(f"📈 Property Crime vs. Pending Streetlight Requests:")
@@ -190,14 +246,16 @@ if len(analysis_df) > 0 and analysis_df['avg_response_time_days'].sum() > 0:
     # Only use neighborhoods with actual response times
     mask = analysis_df['avg_response_time_days'] > 0
     if mask.sum() > 2:  # Need at least 3 points
-        corr, p_value = stats.pearsonr(
-            analysis_df[mask]['total_crimes'],
-            analysis_df[mask]['avg_response_time_days']
+        corr_matrix, p_matrix = pearson_matrix(
+            analysis_df[mask],
+            ['total_crimes', 'avg_response_time_days']
         )
+        corr = corr_matrix.loc['total_crimes', 'avg_response_time_days']
+        p_value = p_matrix.loc['total_crimes', 'avg_response_time_days']
         correlations['total_crime_vs_response_time'] = {
-            'correlation': float(corr),
-            'p_value': float(p_value),
-            'significant': bool(p_value < 0.05)
+            'correlation': corr,
+            'p_value': p_value,
+            'significant': p_value < 0.05
         }
         
         print(f"📈 Total Crime vs. Streetlight Response Time:")
@@ -222,28 +280,32 @@ analysis_df['crime_per_light_request'] = (
 # Top 5 neighborhoods with most pending streetlight requests
 top_pending = analysis_df.nlargest(5, 'pending_streetlight_requests')
 print("⚠️  Top 5 Neighborhoods with Most Pending Streetlight Requests:")
-for idx, row in top_pending.iterrows():
-    print(f"   {idx}: {row['pending_streetlight_requests']:.0f} pending, {row['total_crimes']:.0f} crimes")
+for idx, pending, crimes in top_pending[['pending_streetlight_requests', 'total_crimes']].itertuples(name=None):
+    print(f"   {idx}: {pending:.0f} pending, {crimes:.0f} crimes")
 print()
 
 # Top 5 neighborhoods with highest crime rates
 top_crime = analysis_df.nlargest(5, 'total_crimes')
 print("🚨 Top 5 Neighborhoods with Most Crime:")
-for idx, row in top_crime.iterrows():
-    print(f"   {idx}: {row['total_crimes']:.0f} crimes, {row['pending_streetlight_requests']:.0f} pending lights")
+for idx, crimes, pending in top_crime[['total_crimes', 'pending_streetlight_requests']].itertuples(name=None):
+    print(f"   {idx}: {crimes:.0f} crimes, {pending:.0f} pending lights")
 print()
 
 # Best performers - low crime, low pending lights
+# Reduce the maxima to scalars first so the score is one pass over the arrays
+total_crimes = analysis_df['total_crimes'].to_numpy(dtype=np.float64)
+pending_lights = analysis_df['pending_streetlight_requests'].to_numpy(dtype=np.float64)
 analysis_df['performance_score'] = (
-    100 - 
-    (analysis_df['total_crimes'] / analysis_df['total_crimes'].max() * 50) -
-    (analysis_df['pending_streetlight_requests'] / analysis_df['pending_streetlight_requests'].max() * 50)
+    100.0 -
+    total_crimes * (50.0 / total_crimes.max()) -
+    pending_lights * (50.0 / pending_lights.max())
 )
 
 top_performers = analysis_df.nlargest(5, 'performance_score')
 print("✨ Top 5 Best Performing Neighborhoods:")
-for idx, row in top_performers.iterrows():
-    print(f"   {idx}: Score {row['performance_score']:.1f}, {row['total_crimes']:.0f} crimes, {row['pending_streetlight_requests']:.0f} pending")
+top_performer_rows = top_performers[['performance_score', 'total_crimes', 'pending_streetlight_requests']]
+for idx, score, crimes, pending in top_performer_rows.itertuples(name=None):
+    print(f"   {idx}: Score {score:.1f}, {crimes:.0f} crimes, {pending:.0f} pending")
 print()
 
 # ============================================================================
@@ -260,43 +322,35 @@ print(f"✅ Saved neighborhood analysis to: {analysis_csv_path}")
 
 # Save correlations
 correlations_path = f"{ANALYSIS_DIR}/correlations.json"
-with open(correlations_path, 'w') as f:
-    json.dump(correlations, f, indent=2)
+with open(correlations_path, 'wb') as f:
+    f.write(orjson.dumps(correlations, option=JSON_OPTIONS))
 print(f"✅ Saved correlations to: {correlations_path}")
 
 # Create summary for AI analysis
 ai_summary = {
     'dataset_summary': {
         'total_neighborhoods': len(analysis_df),
-        'total_crimes': int(analysis_df['total_crimes'].sum()),
-        'total_streetlight_requests': int(analysis_df['total_streetlight_requests'].sum()),
-        'pending_streetlight_requests': int(analysis_df['pending_streetlight_requests'].sum()),
-        'avg_response_time_days': float(analysis_df['avg_response_time_days'].mean())
+        'total_crimes': analysis_df['total_crimes'].sum(),
+        'total_streetlight_requests': analysis_df['total_streetlight_requests'].sum(),
+        'pending_streetlight_requests': analysis_df['pending_streetlight_requests'].sum(),
+        'avg_response_time_days': analysis_df['avg_response_time_days'].mean()
     },
     'correlations': correlations,
-    'top_pending_neighborhoods': [
-        {
-            'neighborhood': idx,
-            'pending_lights': int(row['pending_streetlight_requests']),
-            'total_crimes': int(row['total_crimes']),
-            'property_crimes': int(row['property_crimes'])
-        }
-        for idx, row in top_pending.iterrows()
-    ],
-    'top_crime_neighborhoods': [
-        {
-            'neighborhood': idx,
-            'total_crimes': int(row['total_crimes']),
-            'pending_lights': int(row['pending_streetlight_requests']),
-            'avg_response_time': float(row['avg_response_time_days'])
-        }
-        for idx, row in top_crime.iterrows()
-    ]
+    'top_pending_neighborhoods': neighborhood_records(top_pending, {
+        'pending_streetlight_requests': 'pending_lights',
+        'total_crimes': 'total_crimes',
+        'property_crimes': 'property_crimes'
+    }),
+    'top_crime_neighborhoods': neighborhood_records(top_crime, {
+        'total_crimes': 'total_crimes',
+        'pending_streetlight_requests': 'pending_lights',
+        'avg_response_time_days': 'avg_response_time'
+    })
 }
 
 ai_summary_path = f"{ANALYSIS_DIR}/ai_analysis_input.json"
-with open(ai_summary_path, 'w') as f:
-    json.dump(ai_summary, f, indent=2)
+with open(ai_summary_path, 'wb') as f:
+    f.write(orjson.dumps(ai_summary, option=JSON_OPTIONS))
 print(f"✅ Saved AI analysis input to: {ai_summary_path}")
 print()
 
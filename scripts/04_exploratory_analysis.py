@@ -9,9 +9,11 @@ Discovers correlations, outliers, and hidden patterns in Denver civic data.
 
 import pandas as pd
 import numpy as np
-from scipy import stats
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from scipy.cluster.hierarchy import dendrogram, linkage
-import json
+import orjson
 import os
 
 # Configuration
@@ -19,9 +21,45 @@ DATA_DIR = "data"
 PROCESSED_DIR = f"{DATA_DIR}/processed"
 ANALYSIS_DIR = "analysis"
 EXPLORATORY_DIR = f"{ANALYSIS_DIR}/exploratory"
+# Hour/month counts are keyed by integers, hence OPT_NON_STR_KEYS
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
 
 os.makedirs(EXPLORATORY_DIR, exist_ok=True)
 
+def read_columns(path, columns):
+    """Read only the listed columns that exist in a Parquet file"""
+    available = set(pq.read_schema(path).names)
+    return pd.read_parquet(path, columns=[col for col in columns if col in available])
+
+def category_flag(series, pattern):
+    """Flag rows whose category matches a regex, testing each distinct value once
+    
+    The distinct values are matched case-insensitively by Arrow's regex
+    kernel (RE2 syntax), so no lowercased copy is made.
+    """
+    categorical = series.astype('category')
+    categories = pa.array(categorical.cat.categories, type=pa.string())
+    matches = pc.match_substring_regex(categories, pattern, ignore_case=True).to_numpy(zero_copy_only=False)
+    # Missing values have code -1, which picks up the trailing False
+    return np.append(matches, False)[categorical.cat.codes.to_numpy()]
+
+def count_correlation(crime_counts, light_counts, size):
+    """Correlate two small integer-keyed count series over the crime keys
+    
+    Both series are laid out in fixed-size arrays indexed by key (hour or
+    month), so no aligned Series has to be built; keys without crimes are
+    left out and missing streetlight keys count as zero.
+    """
+    crime = np.bincount(crime_counts.index.to_numpy(dtype=np.int64),
+                        weights=crime_counts.to_numpy(dtype=np.float64), minlength=size)
+    lights = np.bincount(light_counts.index.to_numpy(dtype=np.int64),
+                         weights=light_counts.to_numpy(dtype=np.float64), minlength=size)
+    observed = crime > 0
+    if observed.sum() < 2:
+        return float('nan')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return float(np.corrcoef(crime[observed], lights[observed])[0, 1])
+
 print("=" * 80)
 print("ETHICA.DESIGN - EXPLORATORY DATA ANALYSIS")
 print("Discovering Hidden Patterns in Denver Civic Data")
@@ -35,21 +73,26 @@ print()
 print("📂 LOADING DATA...")
 print("-" * 80)
 
-crime_df = pd.read_csv(f"{PROCESSED_DIR}/crime_cleaned.csv")
-service_311_df = pd.read_csv(f"{PROCESSED_DIR}/311_requests_cleaned.csv")
-streetlight_df = pd.read_csv(f"{PROCESSED_DIR}/311_streetlights_cleaned.csv")
+# Project only the columns this script aggregates; addresses, coordinates
+# and the raw date strings never leave the Parquet files
+crime_df = read_columns(f"{PROCESSED_DIR}/crime_cleaned.parquet", [
+    'incident_id', 'offense_category', 'neighborhood', 'is_traffic',
+    'year', 'month', 'day_of_week', 'hour'
+])
+# Only the count of all 311 requests is used, which the Parquet footer already records
+total_311_requests = pq.ParquetFile(f"{PROCESSED_DIR}/311_requests_cleaned.parquet").metadata.num_rows
+streetlight_df = read_columns(f"{PROCESSED_DIR}/311_streetlights_cleaned.parquet", [
+    'case_id', 'neighborhood', 'opened_date', 'response_time_days'
+])
+
+# Parse opened dates once; timespans and temporal patterns below reuse them
+streetlight_df['opened_date'] = pd.to_datetime(streetlight_df['opened_date'], errors='coerce')
 
 print(f"✅ Loaded {len(crime_df):,} crime records")
-print(f"✅ Loaded {len(service_311_df):,} 311 service requests")
+print(f"✅ Loaded {total_311_requests:,} 311 service requests")
 print(f"✅ Loaded {len(streetlight_df):,} streetlight requests")
 print()
 
-# Parse dates
-crime_df['first_occurrence_date'] = pd.to_datetime(crime_df['first_occurrence_date'])
-crime_df['reported_date'] = pd.to_datetime(crime_df['reported_date'])
-streetlight_df['opened_date'] = pd.to_datetime(streetlight_df['opened_date'])
-streetlight_df['closed_date'] = pd.to_datetime(streetlight_df['closed_date'])
-
 # ============================================================================
 # PART 1: COMPREHENSIVE CORRELATION ANALYSIS
 # ============================================================================
@@ -60,55 +103,65 @@ print("-" * 80)
 # Aggregate multiple dimensions by neighborhood
 print("Building multi-dimensional neighborhood profiles...")
 
-# Crime dimensions
-crime_by_hood = crime_df.groupby('neighborhood').agg({
-    'incident_id': 'count',
-    'is_traffic': 'sum',
-    'year': lambda x: x.mode()[0] if len(x) > 0 else None,  # Most common year
-    'month': 'mean',  # Average month
-    'hour': 'mean',  # Average hour of crime
-}).rename(columns={
-    'incident_id': 'total_crimes',
-    'is_traffic': 'traffic_crimes',
-    'year': 'most_common_crime_year',
-    'month': 'avg_crime_month',
-    'hour': 'avg_crime_hour'
-})
-
-# Crime by time of day
-crime_df['time_period'] = pd.cut(crime_df['hour'],
-                                  bins=[0, 6, 12, 18, 24],
-                                  labels=['night', 'morning', 'afternoon', 'evening'])
-time_crimes = crime_df.groupby(['neighborhood', 'time_period']).size().unstack(fill_value=0)
-crime_by_hood['night_crimes'] = time_crimes.get('night', 0)
-crime_by_hood['morning_crimes'] = time_crimes.get('morning', 0)
-crime_by_hood['afternoon_crimes'] = time_crimes.get('afternoon', 0)
-crime_by_hood['evening_crimes'] = time_crimes.get('evening', 0)
-
-# Crime by day of week
+# Crime dimensions: flag each crime once, then build every per-neighborhood
+# count and average in a single groupby pass
+# Six-hour periods (0, 6], (6, 12], (12, 18], (18, 24] by integer division;
+# as with the original pd.cut bins, hour 0 falls outside every period
+hours = crime_df['hour'].to_numpy()
+period_codes = np.where(hours > 0, (hours - 1) // 6, -1).astype(np.int8)
+crime_df['time_period'] = pd.Categorical.from_codes(
+    period_codes, categories=['night', 'morning', 'afternoon', 'evening'], ordered=True
+)
 crime_df['is_weekend'] = crime_df['day_of_week'].isin(['Saturday', 'Sunday'])
-weekend_crimes = crime_df[crime_df['is_weekend']].groupby('neighborhood').size()
-crime_by_hood['weekend_crimes'] = weekend_crimes
-crime_by_hood['weekday_crimes'] = crime_by_hood['total_crimes'] - crime_by_hood['weekend_crimes'].fillna(0)
 
 # Crime categories
 property_crimes = ['theft', 'burglary', 'motor-vehicle-theft', 'larceny', 'arson', 'vandalism']
 violent_crimes = ['assault', 'robbery', 'murder', 'sexual-assault']
-crime_df['is_property_crime'] = crime_df['offense_category'].str.lower().str.contains('|'.join(property_crimes), na=False)
-crime_df['is_violent_crime'] = crime_df['offense_category'].str.lower().str.contains('|'.join(violent_crimes), na=False)
-
-property_by_hood = crime_df[crime_df['is_property_crime']].groupby('neighborhood').size()
-violent_by_hood = crime_df[crime_df['is_violent_crime']].groupby('neighborhood').size()
-crime_by_hood['property_crimes'] = property_by_hood
-crime_by_hood['violent_crimes'] = violent_by_hood
+crime_df['is_property_crime'] = category_flag(crime_df['offense_category'], '|'.join(property_crimes))
+crime_df['is_violent_crime'] = category_flag(crime_df['offense_category'], '|'.join(violent_crimes))
+
+# One indicator column per time of day (hour 0 falls outside every bin)
+period_flags = pd.get_dummies(crime_df['time_period']).add_suffix('_crimes')
+crime_features = pd.concat([
+    crime_df[['neighborhood', 'incident_id', 'is_traffic', 'month', 'hour',
+              'is_weekend', 'is_property_crime', 'is_violent_crime']],
+    period_flags
+], axis=1)
+
+crime_by_hood = crime_features.groupby('neighborhood', observed=True).agg(
+    total_crimes=('incident_id', 'count'),
+    traffic_crimes=('is_traffic', 'sum'),
+    avg_crime_month=('month', 'mean'),
+    avg_crime_hour=('hour', 'mean'),
+    night_crimes=('night_crimes', 'sum'),
+    morning_crimes=('morning_crimes', 'sum'),
+    afternoon_crimes=('afternoon_crimes', 'sum'),
+    evening_crimes=('evening_crimes', 'sum'),
+    weekend_crimes=('is_weekend', 'sum'),
+    property_crimes=('is_property_crime', 'sum'),
+    violent_crimes=('is_violent_crime', 'sum')
+)
+del crime_features
+
+# Most common year; idxmax takes the earliest year on ties, as mode() did
+year_counts = crime_df.groupby(['neighborhood', 'year'], observed=True).size().unstack(fill_value=0)
+crime_by_hood.insert(2, 'most_common_crime_year', year_counts.idxmax(axis=1))
+crime_by_hood.insert(
+    crime_by_hood.columns.get_loc('weekend_crimes') + 1,
+    'weekday_crimes',
+    crime_by_hood['total_crimes'] - crime_by_hood['weekend_crimes']
+)
 
 # 311 Service dimensions
 if 'neighborhood' in streetlight_df.columns:
-    streetlight_by_hood = streetlight_df[streetlight_df['neighborhood'].notna()].groupby('neighborhood').agg({
+    streetlight_by_hood = streetlight_df[streetlight_df['neighborhood'].notna()].groupby('neighborhood', observed=True).agg({
         'case_id': 'count',
         'response_time_days': ['mean', 'median', 'std', 'min', 'max'],
-        'opened_date': lambda x: (pd.to_datetime(x).max() - pd.to_datetime(x).min()).days
+        'opened_date': ['min', 'max']
     })
+    opened_last = streetlight_by_hood.pop(('opened_date', 'max'))
+    opened_first = streetlight_by_hood.pop(('opened_date', 'min'))
+    streetlight_by_hood[('opened_date', 'timespan')] = (opened_last - opened_first).dt.days
 
     streetlight_by_hood.columns = [
         'total_streetlight_requests',
@@ -130,25 +183,30 @@ if 'neighborhood' in streetlight_df.columns:
 
     # Calculate ALL correlations
     print("Computing full correlation matrix...")
-    correlation_matrix = analysis_df.corr()
-
-    # Find strongest correlations (excluding self-correlations)
-    correlations_list = []
-    for i in range(len(correlation_matrix.columns)):
-        for j in range(i+1, len(correlation_matrix.columns)):
-            col1 = correlation_matrix.columns[i]
-            col2 = correlation_matrix.columns[j]
-            corr_value = correlation_matrix.iloc[i, j]
-
-            if not np.isnan(corr_value) and abs(corr_value) > 0.3:  # Only meaningful correlations
-                correlations_list.append({
-                    'feature1': col1,
-                    'feature2': col2,
-                    'correlation': corr_value,
-                    'abs_correlation': abs(corr_value)
-                })
-
-    correlations_df = pd.DataFrame(correlations_list).sort_values('abs_correlation', ascending=False)
+    # One centered matrix product instead of pandas' pairwise column loop;
+    # the frame has no NaNs after fillna, so pairwise deletion isn't needed.
+    # Constant features come out as NaN, as with DataFrame.corr()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation_matrix = pd.DataFrame(
+            np.corrcoef(analysis_df.to_numpy(dtype=np.float64), rowvar=False),
+            index=analysis_df.columns,
+            columns=analysis_df.columns
+        )
+
+    # Find strongest correlations (excluding self-correlations), reading the
+    # upper triangle of the matrix in one indexing step
+    feature_names = correlation_matrix.columns.to_numpy()
+    rows, cols = np.triu_indices(len(feature_names), k=1)
+    corr_values = correlation_matrix.to_numpy()[rows, cols]
+    abs_values = np.abs(corr_values)
+    meaningful = abs_values > 0.3  # Only meaningful correlations (NaN compares False)
+
+    correlations_df = pd.DataFrame({
+        'feature1': feature_names[rows[meaningful]],
+        'feature2': feature_names[cols[meaningful]],
+        'correlation': corr_values[meaningful],
+        'abs_correlation': abs_values[meaningful]
+    }).sort_values('abs_correlation', ascending=False)
 
     print(f"✅ Found {len(correlations_df)} significant correlations (|r| > 0.3)")
     print()
@@ -173,27 +231,29 @@ print("-" * 80)
 # Normalize data using z-scores
 print("Normalizing data using z-scores...")
 numeric_cols = analysis_df.select_dtypes(include=[np.number]).columns
-z_scores = np.abs(stats.zscore(analysis_df[numeric_cols], nan_policy='omit'))
-z_scores_df = pd.DataFrame(z_scores, columns=numeric_cols, index=analysis_df.index)
-
-# Find outliers (z-score > 2.5)
-outliers = {}
-for col in numeric_cols:
-    outlier_mask = z_scores_df[col] > 2.5
-    if outlier_mask.any():
-        outlier_neighborhoods = analysis_df[outlier_mask].index.tolist()
-        outlier_values = analysis_df.loc[outlier_mask, col].tolist()
-        z_values = z_scores_df.loc[outlier_mask, col].tolist()
-
-        outliers[col] = [
-            {
-                'neighborhood': hood,
-                'value': float(val),
-                'z_score': float(z),
-                'interpretation': 'high' if val > analysis_df[col].median() else 'low'
-            }
-            for hood, val, z in zip(outlier_neighborhoods, outlier_values, z_values)
-        ]
+values = np.ascontiguousarray(analysis_df[numeric_cols].to_numpy(dtype=np.float64))
+# Same result as scipy's zscore(values, nan_policy='omit'), with the centring
+# and scaling done in place on a single buffer
+with np.errstate(invalid='ignore', divide='ignore'):
+    z_scores = values - np.nanmean(values, axis=0)
+    z_scores /= np.nanstd(values, axis=0)
+
+# Find outliers (|z-score| > 2.5, tested as z² > 6.25 to skip an abs pass)
+# from one mask over the whole matrix, as a flat table with one row per
+# outlier; the mask is walked transposed so features come out in column order
+medians = np.nanmedian(values, axis=0)
+cols, rows = np.nonzero((z_scores * z_scores).T > 2.5 ** 2)
+outlier_table = pd.DataFrame({
+    'feature': numeric_cols[cols],
+    'neighborhood': analysis_df.index.to_numpy()[rows],
+    'value': values[rows, cols],
+    'z_score': np.abs(z_scores[rows, cols]),
+    'interpretation': np.where(values[rows, cols] > medians[cols], 'high', 'low')
+})
+outliers = {
+    feature: group[['neighborhood', 'value', 'z_score', 'interpretation']].to_dict(orient='records')
+    for feature, group in outlier_table.groupby('feature', sort=False)
+}
 
 print(f"✅ Found outliers in {len(outliers)} features")
 print()
@@ -208,19 +268,11 @@ for feature, outlier_list in sorted(outliers.items(), key=lambda x: len(x[1]), r
 print()
 
 # Multi-dimensional outliers (neighborhoods that are outliers in multiple ways)
-outlier_counts = {}
-for feature, outlier_list in outliers.items():
-    for outlier in outlier_list:
-        hood = outlier['neighborhood']
-        if hood not in outlier_counts:
-            outlier_counts[hood] = []
-        outlier_counts[hood].append({
-            'feature': feature,
-            'z_score': outlier['z_score'],
-            'interpretation': outlier['interpretation']
-        })
-
-multi_outliers = {k: v for k, v in outlier_counts.items() if len(v) >= 3}
+outlier_counts = outlier_table.groupby('neighborhood', sort=False)['feature'].transform('size')
+multi_outliers = {
+    hood: group[['feature', 'z_score', 'interpretation']].to_dict(orient='records')
+    for hood, group in outlier_table[outlier_counts >= 3].groupby('neighborhood', sort=False)
+}
 print("\n🎭 MULTI-DIMENSIONAL OUTLIERS (unusual in 3+ ways):")
 print("-" * 80)
 for hood, features in sorted(multi_outliers.items(), key=lambda x: len(x[1]), reverse=True)[:5]:
@@ -231,11 +283,11 @@ for hood, features in sorted(multi_outliers.items(), key=lambda x: len(x[1]), re
 print()
 
 # Save outlier analysis
-with open(f"{EXPLORATORY_DIR}/outliers.json", 'w') as f:
-    json.dump(outliers, f, indent=2)
+with open(f"{EXPLORATORY_DIR}/outliers.json", 'wb') as f:
+    f.write(orjson.dumps(outliers, option=JSON_OPTIONS))
 
-with open(f"{EXPLORATORY_DIR}/multi_dimensional_outliers.json", 'w') as f:
-    json.dump(multi_outliers, f, indent=2)
+with open(f"{EXPLORATORY_DIR}/multi_dimensional_outliers.json", 'wb') as f:
+    f.write(orjson.dumps(multi_outliers, option=JSON_OPTIONS))
 
 # ============================================================================
 # PART 3: TEMPORAL PATTERNS
@@ -246,15 +298,13 @@ print("-" * 80)
 
 # Crime temporal patterns
 print("Analyzing crime temporal patterns...")
-hourly_crime = crime_df.groupby('hour').size()
-daily_crime = crime_df.groupby('day_of_week').size()
-monthly_crime = crime_df.groupby('month').size()
+hourly_crime = crime_df['hour'].value_counts().sort_index()
+daily_crime = crime_df['day_of_week'].value_counts(sort=False)  # Monday first
+monthly_crime = crime_df['month'].value_counts().sort_index()
 
 # Streetlight temporal patterns
-streetlight_df['opened_hour'] = pd.to_datetime(streetlight_df['opened_date']).dt.hour
-streetlight_df['opened_month'] = pd.to_datetime(streetlight_df['opened_date']).dt.month
-hourly_lights = streetlight_df.groupby('opened_hour').size()
-monthly_lights = streetlight_df.groupby('opened_month').size()
+hourly_lights = streetlight_df['opened_date'].dt.hour.value_counts().sort_index()
+monthly_lights = streetlight_df['opened_date'].dt.month.value_counts().sort_index()
 
 print(f"\n📊 Crime Peak Times:")
 print(f"   Peak hour: {hourly_crime.idxmax()}:00 ({hourly_crime.max():,} crimes)")
@@ -266,8 +316,8 @@ print(f"   Peak hour: {hourly_lights.idxmax()}:00 ({hourly_lights.max():,} reque
 print(f"   Peak month: {monthly_lights.idxmax()} ({monthly_lights.max():,} requests)")
 
 # Are crimes and streetlight requests correlated by time?
-hourly_corr = hourly_crime.corr(hourly_lights.reindex(hourly_crime.index, fill_value=0))
-monthly_corr = monthly_crime.corr(monthly_lights.reindex(monthly_crime.index, fill_value=0))
+hourly_corr = count_correlation(hourly_crime, hourly_lights, 24)
+monthly_corr = count_correlation(monthly_crime, monthly_lights, 13)
 
 print(f"\n⏱️  Temporal Synchronicity:")
 print(f"   Hourly correlation: {hourly_corr:.3f}")
@@ -283,8 +333,8 @@ temporal_analysis = {
     'monthly_correlation': float(monthly_corr)
 }
 
-with open(f"{EXPLORATORY_DIR}/temporal_patterns.json", 'w') as f:
-    json.dump(temporal_analysis, f, indent=2)
+with open(f"{EXPLORATORY_DIR}/temporal_patterns.json", 'wb') as f:
+    f.write(orjson.dumps(temporal_analysis, option=JSON_OPTIONS))
 
 # ============================================================================
 # PART 4: CRIME TYPE DEEP DIVE
@@ -310,21 +360,19 @@ for crime_type, count in night_types.head(5).items():
     pct = (count / len(night_crimes)) * 100
     print(f"   {crime_type:40} {count:>7,} ({pct:>5.1f}%)")
 
-# Crime type diversity by neighborhood (Shannon entropy)
-from scipy.stats import entropy
-
-neighborhood_diversity = {}
-for hood in crime_df['neighborhood'].unique():
-    hood_crimes = crime_df[crime_df['neighborhood'] == hood]['offense_category'].value_counts()
-    hood_crimes_norm = hood_crimes / hood_crimes.sum()
-    diversity = entropy(hood_crimes_norm)
-    neighborhood_diversity[hood] = {
-        'entropy': float(diversity),
-        'num_crime_types': len(hood_crimes),
-        'total_crimes': int(hood_crimes.sum())
-    }
+# Crime type diversity by neighborhood (Shannon entropy), from one
+# neighborhood x offense category count matrix
+from scipy.special import entr
 
-diversity_df = pd.DataFrame(neighborhood_diversity).T.sort_values('entropy', ascending=False)
+type_counts = crime_df.groupby(['neighborhood', 'offense_category'], observed=True).size().unstack(fill_value=0)
+counts = type_counts.to_numpy(dtype=np.float64)
+totals = counts.sum(axis=1)
+
+diversity_df = pd.DataFrame({
+    'entropy': entr(counts / totals[:, np.newaxis]).sum(axis=1),
+    'num_crime_types': (counts > 0).sum(axis=1),
+    'total_crimes': totals.astype(np.int64)
+}, index=type_counts.index.rename(None)).sort_values('entropy', ascending=False)
 
 print(f"\n🌈 Most Diverse Crime Portfolios (top 5):")
 for hood, row in diversity_df.head(5).iterrows():
@@ -343,33 +391,38 @@ diversity_df.to_csv(f"{EXPLORATORY_DIR}/neighborhood_crime_diversity.csv")
 print("\n\n⚡ PART 5: RESPONSE TIME ANOMALY DETECTION")
 print("-" * 80)
 
-# Filter valid response times
-valid_response = streetlight_df[
-    (streetlight_df['response_time_days'].notna()) &
-    (streetlight_df['response_time_days'] >= 0) &
-    (streetlight_df['response_time_days'] < 365)  # Less than a year
-]
+# Filter valid response times (less than a year) as a mask over the raw
+# array; NaN fails both comparisons, so missing times drop out too
+response_times = streetlight_df['response_time_days'].to_numpy(dtype=np.float64)
+valid = (response_times >= 0) & (response_times < 365)
+valid_times = response_times[valid]
 
-print(f"Analyzing {len(valid_response):,} streetlight requests with valid response times...")
+print(f"Analyzing {len(valid_times):,} streetlight requests with valid response times...")
 
 # Response time statistics
-response_stats = {
-    'mean': float(valid_response['response_time_days'].mean()),
-    'median': float(valid_response['response_time_days'].median()),
-    'std': float(valid_response['response_time_days'].std()),
-    'min': float(valid_response['response_time_days'].min()),
-    'max': float(valid_response['response_time_days'].max()),
-    'q25': float(valid_response['response_time_days'].quantile(0.25)),
-    'q75': float(valid_response['response_time_days'].quantile(0.75))
-}
+if len(valid_times) > 0:
+    q25, median, q75 = np.quantile(valid_times, [0.25, 0.5, 0.75])
+    response_stats = {
+        'mean': float(valid_times.mean()),
+        'median': float(median),
+        'std': float(valid_times.std(ddof=1)),
+        'min': float(valid_times.min()),
+        'max': float(valid_times.max()),
+        'q25': float(q25),
+        'q75': float(q75)
+    }
+else:
+    response_stats = dict.fromkeys(['mean', 'median', 'std', 'min', 'max', 'q25', 'q75'], float('nan'))
 
 # IQR outlier detection
 iqr = response_stats['q75'] - response_stats['q25']
 lower_bound = response_stats['q25'] - 1.5 * iqr
 upper_bound = response_stats['q75'] + 1.5 * iqr
 
-fast_outliers = valid_response[valid_response['response_time_days'] < lower_bound]
-slow_outliers = valid_response[valid_response['response_time_days'] > upper_bound]
+fast_outliers = valid & (response_times < lower_bound)
+slow_outliers = valid & (response_times > upper_bound)
+fast_count = int(np.count_nonzero(fast_outliers))
+slow_count = int(np.count_nonzero(slow_outliers))
 
 print(f"\n📈 Response Time Statistics:")
 print(f"   Mean: {response_stats['mean']:.1f} days")
@@ -377,18 +430,18 @@ print(f"   Median: {response_stats['median']:.1f} days")
 print(f"   Std Dev: {response_stats['std']:.1f} days")
 print(f"   Range: {response_stats['min']:.1f} - {response_stats['max']:.1f} days")
 
-print(f"\n⚡ Unusually FAST responses (<{lower_bound:.1f} days): {len(fast_outliers)}")
-if len(fast_outliers) > 0:
-    print(f"   Fastest: {fast_outliers['response_time_days'].min():.1f} days")
-    fast_hoods = fast_outliers.groupby('neighborhood').size().sort_values(ascending=False).head(3)
+print(f"\n⚡ Unusually FAST responses (<{lower_bound:.1f} days): {fast_count}")
+if fast_count > 0:
+    print(f"   Fastest: {response_times[fast_outliers].min():.1f} days")
+    fast_hoods = streetlight_df.loc[fast_outliers, ['neighborhood']].groupby('neighborhood', observed=True).size().sort_values(ascending=False).head(3)
     print(f"   Top neighborhoods with fast responses:")
     for hood, count in fast_hoods.items():
         print(f"      {hood}: {count} fast repairs")
 
-print(f"\n🐌 Unusually SLOW responses (>{upper_bound:.1f} days): {len(slow_outliers)}")
-if len(slow_outliers) > 0:
-    print(f"   Slowest: {slow_outliers['response_time_days'].max():.1f} days")
-    slow_hoods = slow_outliers.groupby('neighborhood').size().sort_values(ascending=False).head(3)
+print(f"\n🐌 Unusually SLOW responses (>{upper_bound:.1f} days): {slow_count}")
+if slow_count > 0:
+    print(f"   Slowest: {response_times[slow_outliers].max():.1f} days")
+    slow_hoods = streetlight_df.loc[slow_outliers, ['neighborhood']].groupby('neighborhood', observed=True).size().sort_values(ascending=False).head(3)
     print(f"   Top neighborhoods with slow responses:")
     for hood, count in slow_hoods.items():
         print(f"      {hood}: {count} slow repairs")
@@ -400,12 +453,12 @@ response_analysis = {
         'lower': float(lower_bound),
         'upper': float(upper_bound)
     },
-    'fast_outliers': len(fast_outliers),
-    'slow_outliers': len(slow_outliers)
+    'fast_outliers': fast_count,
+    'slow_outliers': slow_count
 }
 
-with open(f"{EXPLORATORY_DIR}/response_time_analysis.json", 'w') as f:
-    json.dump(response_analysis, f, indent=2)
+with open(f"{EXPLORATORY_DIR}/response_time_analysis.json", 'wb') as f:
+    f.write(orjson.dumps(response_analysis, option=JSON_OPTIONS))
 
 # ============================================================================
 # SUMMARY REPORT
@@ -419,7 +472,7 @@ summary = {
     'data_overview': {
         'neighborhoods_analyzed': len(analysis_df),
         'total_crimes': int(crime_df.shape[0]),
-        'total_311_requests': int(service_311_df.shape[0]),
+        'total_311_requests': total_311_requests,
         'total_streetlight_requests': int(streetlight_df.shape[0])
     },
     'correlation_insights': {
@@ -447,8 +500,8 @@ summary = {
     'response_time_insights': response_analysis
 }
 
-with open(f"{EXPLORATORY_DIR}/summary.json", 'w') as f:
-    json.dump(summary, f, indent=2)
+with open(f"{EXPLORATORY_DIR}/summary.json", 'wb') as f:
+    f.write(orjson.dumps(summary, option=JSON_OPTIONS))
 
 print("\n✅ Exploratory analysis complete!")
 print(f"\n📁 All results saved to: {EXPLORATORY_DIR}/")
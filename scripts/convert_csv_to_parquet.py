@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Ethica.Design - Civic Data Intelligence Platform
+CSV to Parquet Conversion Utility
+
+One-time conversion of the large raw CSVs that are read as-is by the MVP
+builder (city checkbook, Zillow home values) into typed Parquet files, so
+later runs skip CSV parsing. 05_build_mvp.py uses the Parquet copy when
+it exists and falls back to the CSV otherwise.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import os
+
+# Configuration
+DATA_DIR = "data"
+RAW_DIR = f"{DATA_DIR}/raw"
+BLOCK_SIZE = 64 * 1024 * 1024
+
+
+def checkbook_types(columns):
+    """Keep every checkbook column as text; amounts are coerced when used"""
+    return {col: pa.string() for col in columns}
+
+
+def zillow_types(columns):
+    """Monthly value columns (named by date) are numbers, the rest text"""
+    return {col: pa.float64() if col.startswith('20') else pa.string() for col in columns}
+
+
+def convert(name, column_types):
+    """Stream a raw CSV into a zstd-compressed Parquet file next to it"""
+    csv_path = f"{RAW_DIR}/{name}.csv"
+    parquet_path = f"{RAW_DIR}/{name}.parquet"
+
+    if not os.path.exists(csv_path):
+        print(f"⚠️  {csv_path} not found, skipping")
+        return
+
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types(columns),
+            strings_can_be_null=True
+        )
+    )
+
+    row_count = 0
+    with pq.ParquetWriter(parquet_path, reader.schema, compression='zstd') as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            row_count += batch.num_rows
+
+    csv_size = os.path.getsize(csv_path) / (1024 * 1024)
+    parquet_size = os.path.getsize(parquet_path) / (1024 * 1024)
+    print(f"✅ {csv_path} → {parquet_path}")
+    print(f"   {row_count:,} rows, {csv_size:.2f} MB → {parquet_size:.2f} MB")
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("CONVERTING RAW CSV FILES TO PARQUET")
+    print("=" * 80)
+    print()
+
+    convert("checkbook_raw", checkbook_types)
+    convert("zillow_neighborhood_values", zillow_types)
+
+    print()
+    print("=" * 80)
@@ -6,8 +6,10 @@ Neighborhood intelligence reports for Denver real estate
 
 from flask import Flask, render_template, request, jsonify, send_file
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
@@ -17,20 +19,56 @@ from reportlab.lib.units import inch
 
 app = Flask(__name__)
 
-# Load neighborhood data
-DATA_FILE = '../mvp_output/neighborhood_profiles.csv'
-neighborhoods_df = pd.read_csv(DATA_FILE)
-
-# Ensure numeric columns are properly typed
-numeric_cols = ['total_crimes_12mo', 'property_crimes_12mo', 'violent_crimes_12mo',
-                'traffic_crimes_12mo', 'crime_trend_pct', 'total_311_requests',
-                'avg_response_days', 'median_response_days', 'current_home_value',
-                'yoy_appreciation', 'safety_score', 'service_score', 'market_score',
-                'civic_value_ratio', 'civic_value_index']
-
-for col in numeric_cols:
-    if col in neighborhoods_df.columns:
-        neighborhoods_df[col] = pd.to_numeric(neighborhoods_df[col], errors='coerce').fillna(0)
+# Load neighborhood data from the typed Parquet copy written by the MVP
+# builder, so there is no CSV to parse and no columns to convert to numbers
+DATA_FILE = '../mvp_output/neighborhood_profiles.parquet'
+neighborhoods_df = pd.read_parquet(DATA_FILE, engine='pyarrow')
+
+# Missing numbers display as 0
+numeric_cols = neighborhoods_df.select_dtypes('number').columns
+neighborhoods_df[numeric_cols] = neighborhoods_df[numeric_cols].fillna(0)
+
+# Rank neighborhoods once at startup: one more than the number scoring higher
+neighborhoods_df['rank'] = neighborhoods_df['civic_value_index'].rank(ascending=False, method='min').astype(int)
+neighborhoods_df['percentile'] = ((1 - neighborhoods_df['rank'] / len(neighborhoods_df)) * 100).astype(int)
+
+# Lowercased names for search, built once rather than on every keystroke
+neighborhood_names = neighborhoods_df['neighborhood'].str.lower().fillna('').to_numpy(dtype=str)
+
+# Row position of each neighborhood by lowercase name (first row wins)
+neighborhood_index = {}
+for position, lower_name in enumerate(neighborhood_names):
+    neighborhood_index.setdefault(lower_name, position)
+
+# PDF report styles, shared by every download
+STYLES = getSampleStyleSheet()
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1a5490'),
+    spaceAfter=30,
+    alignment=1
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=STYLES['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#1a5490'),
+    spaceAfter=12
+)
+
+SCORE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
 
 @app.route('/')
 def index():
@@ -50,10 +88,9 @@ def search():
     if not query:
         return jsonify([])
 
-    # Filter neighborhoods matching query
-    matches = neighborhoods_df[
-        neighborhoods_df['neighborhood'].str.lower().str.contains(query, na=False)
-    ][['neighborhood', 'civic_value_index', 'current_home_value']].head(10)
+    # Filter neighborhoods containing the query (plain substring match)
+    match_rows = np.flatnonzero(np.char.find(neighborhood_names, query) >= 0)[:10]
+    matches = neighborhoods_df.iloc[match_rows][['neighborhood', 'civic_value_index', 'current_home_value']]
 
     results = matches.to_dict('records')
     return jsonify(results)
@@ -62,23 +99,15 @@ def search():
 def neighborhood_report(name):
     """Display neighborhood report"""
     # Find neighborhood (case-insensitive)
-    hood_data = neighborhoods_df[
-        neighborhoods_df['neighborhood'].str.lower() == name.lower()
-    ]
+    position = neighborhood_index.get(name.lower())
 
-    if hood_data.empty:
+    if position is None:
         return render_template('404.html', neighborhood=name), 404
 
-    hood = hood_data.iloc[0].to_dict()
-
-    # Calculate rank
-    rank = (neighborhoods_df['civic_value_index'] > hood['civic_value_index']).sum() + 1
-    percentile = int((1 - (rank / len(neighborhoods_df))) * 100)
+    hood = neighborhoods_df.iloc[position].to_dict()
 
     # Format data for display
-    hood['rank'] = rank
     hood['total_neighborhoods'] = len(neighborhoods_df)
-    hood['percentile'] = percentile
 
     # Determine tier
     if hood['civic_value_index'] > 70:
@@ -121,58 +150,35 @@ def api_neighborhoods():
                              'total_crimes_12mo']].to_dict('records')
     return jsonify(data)
 
-@app.route('/download/<name>')
-def download_report(name):
-    """Generate and download PDF report"""
-    # Find neighborhood
-    hood_data = neighborhoods_df[
-        neighborhoods_df['neighborhood'].str.lower() == name.lower()
-    ]
-
-    if hood_data.empty:
-        return "Neighborhood not found", 404
-
-    hood = hood_data.iloc[0].to_dict()
-
-    # Calculate rank
-    rank = (neighborhoods_df['civic_value_index'] > hood['civic_value_index']).sum() + 1
-    percentile = int((1 - (rank / len(neighborhoods_df))) * 100)
+@lru_cache(maxsize=256)
+def build_report_pdf(position, report_day):
+    """Render the PDF report for the neighborhood at `position`, as bytes
+    
+    The data is fixed once loaded, so a report only changes with the date
+    printed in its footer; cached per neighborhood and day.
+    """
+    hood = neighborhoods_df.iloc[position].to_dict()
+    rank = hood['rank']
+    percentile = hood['percentile']
 
-    # Create PDF
+    # Create PDF. ReportLab assembles the whole document in memory and
+    # writes it out in one go, so an in-memory buffer costs no more than a
+    # temporary file would
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     story = []
 
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a5490'),
-        spaceAfter=30,
-        alignment=1
-    )
-
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#1a5490'),
-        spaceAfter=12
-    )
-
     # Title
-    story.append(Paragraph("CIVIC VALUE INDEX", title_style))
-    story.append(Paragraph("Neighborhood Intelligence Report", styles['Heading3']))
+    story.append(Paragraph("CIVIC VALUE INDEX", TITLE_STYLE))
+    story.append(Paragraph("Neighborhood Intelligence Report", STYLES['Heading3']))
     story.append(Spacer(1, 0.3*inch))
 
     # Neighborhood name
-    story.append(Paragraph(f"<b>{hood['neighborhood'].upper()}</b>", title_style))
+    story.append(Paragraph(f"<b>{hood['neighborhood'].upper()}</b>", TITLE_STYLE))
     story.append(Spacer(1, 0.2*inch))
 
     # Overall score
-    story.append(Paragraph(f"Overall Civic Value Index: <b>{hood['civic_value_index']:.1f}/100</b>", heading_style))
+    story.append(Paragraph(f"Overall Civic Value Index: <b>{hood['civic_value_index']:.1f}/100</b>", HEADING_STYLE))
     story.append(Spacer(1, 0.3*inch))
 
     # Component scores table
@@ -185,22 +191,13 @@ def download_report(name):
     ]
 
     score_table = Table(score_data, colWidths=[3*inch, 2*inch])
-    score_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    score_table.setStyle(SCORE_TABLE_STYLE)
 
     story.append(score_table)
     story.append(Spacer(1, 0.3*inch))
 
     # Safety Profile
-    story.append(Paragraph("SAFETY PROFILE", heading_style))
+    story.append(Paragraph("SAFETY PROFILE", HEADING_STYLE))
     safety_text = f"""
     Total Crimes (Last 12 months): {int(hood['total_crimes_12mo'])}<br/>
     • Property Crimes: {int(hood['property_crimes_12mo'])}<br/>
@@ -209,46 +206,58 @@ def download_report(name):
     <br/>
     Crime Trend: {hood['crime_trend_pct']:+.1f}%
     """
-    story.append(Paragraph(safety_text, styles['Normal']))
+    story.append(Paragraph(safety_text, STYLES['Normal']))
     story.append(Spacer(1, 0.2*inch))
 
     # Real Estate Market
-    story.append(Paragraph("REAL ESTATE MARKET", heading_style))
+    story.append(Paragraph("REAL ESTATE MARKET", HEADING_STYLE))
     market_text = f"""
     Current Median Home Value: ${int(hood['current_home_value']):,}<br/>
     Year-over-Year Appreciation: {hood['yoy_appreciation']:.1f}%
     """
-    story.append(Paragraph(market_text, styles['Normal']))
+    story.append(Paragraph(market_text, STYLES['Normal']))
     story.append(Spacer(1, 0.2*inch))
 
     # Competitive Positioning
-    story.append(Paragraph("COMPETITIVE POSITIONING", heading_style))
+    story.append(Paragraph("COMPETITIVE POSITIONING", HEADING_STYLE))
     position_text = f"""
     This neighborhood ranks #{rank} out of {len(neighborhoods_df)} Denver neighborhoods.<br/>
     Percentile Rank: {percentile}th percentile
     """
-    story.append(Paragraph(position_text, styles['Normal']))
+    story.append(Paragraph(position_text, STYLES['Normal']))
     story.append(Spacer(1, 0.3*inch))
 
     # Footer
     story.append(Spacer(1, 0.5*inch))
     footer_text = f"""
-    <i>Generated: {datetime.now().strftime('%B %d, %Y')}<br/>
-    Report ID: {hood['neighborhood']}-{datetime.now().strftime('%Y%m%d')}<br/>
+    <i>Generated: {report_day.strftime('%B %d, %Y')}<br/>
+    Report ID: {hood['neighborhood']}-{report_day.strftime('%Y%m%d')}<br/>
     <br/>
     Data Sources: Denver Crime Data, Denver 311, Denver Checkbook, Zillow ZHVI<br/>
     Analysis by: Civic Value Index Platform</i>
     """
-    story.append(Paragraph(footer_text, styles['Normal']))
+    story.append(Paragraph(footer_text, STYLES['Normal']))
 
     # Build PDF
     doc.build(story)
-    buffer.seek(0)
+    return buffer.getvalue()
+
+@app.route('/download/<name>')
+def download_report(name):
+    """Generate and download PDF report"""
+    # Find neighborhood
+    position = neighborhood_index.get(name.lower())
+
+    if position is None:
+        return "Neighborhood not found", 404
+
+    pdf = build_report_pdf(position, datetime.now().date())
 
+    # BytesIO shares the cached bytes rather than copying them
     return send_file(
-        buffer,
+        BytesIO(pdf),
         as_attachment=True,
-        download_name=f'{hood["neighborhood"]}_civic_value_report.pdf',
+        download_name=f'{neighborhoods_df["neighborhood"].iat[position]}_civic_value_report.pdf',
         mimetype='application/pdf'
     )
 